@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import transaction
 from django.db.models import Count
 from django.utils.translation import gettext_lazy as _
 
@@ -7,6 +8,7 @@ from froide.helper.admin_utils import (
     make_choose_object_action,
 )
 
+from .listeners import untracked, update_transcripts_on_commit
 from .models import (
     PressConference,
     PressConferenceCategory,
@@ -15,6 +17,7 @@ from .models import (
     Speech,
     Topic,
 )
+from .tasks import queue_update_transcripts
 
 
 @admin.register(PressConferenceCategory)
@@ -34,12 +37,15 @@ class PressConferenceAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("title",)}
     actions = ["parse_press_conference"]
 
+    def get_queryset(self, request):
+        # The transcript columns are not shown and not editable
+        return super().get_queryset(request).defer("content", "speaker_names")
+
     @admin.action(description=_("Parse press conference"))
     def parse_press_conference(self, request, queryset):
-        from .tasks import parse_pressconference_task
+        from .tasks import queue_parse_pressconferences
 
-        for pc in queryset:
-            parse_pressconference_task.delay(pc.id)
+        queue_parse_pressconferences(queryset)
 
 
 @admin.register(Topic)
@@ -50,7 +56,13 @@ class TopicAdmin(admin.ModelAdmin):
 
 
 def execute_replace_speakers(admin, request, queryset, action_obj):
+    pc_ids = list(
+        Section.objects.filter(speeches__speaker__in=queryset)
+        .values_list("press_conference_id", flat=True)
+        .distinct()
+    )
     Speech.objects.filter(speaker__in=queryset).update(speaker=action_obj)
+    transaction.on_commit(lambda: queue_update_transcripts(pc_ids))
 
 
 @admin.register(Speaker)
@@ -91,6 +103,13 @@ class SectionAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related("press_conference")
 
+    def delete_queryset(self, request, queryset):
+        # Rebuild each press conference once instead of once per section
+        pc_ids = list(queryset.values_list("press_conference_id", flat=True))
+        with untracked():
+            super().delete_queryset(request, queryset)
+        update_transcripts_on_commit(pc_ids)
+
 
 @admin.register(Speech)
 class SpeechAdmin(admin.ModelAdmin):
@@ -106,3 +125,10 @@ class SpeechAdmin(admin.ModelAdmin):
             .get_queryset(request)
             .select_related("section", "section__press_conference", "speaker")
         )
+
+    def delete_queryset(self, request, queryset):
+        # Rebuild each press conference once instead of once per speech
+        pc_ids = list(queryset.values_list("section__press_conference_id", flat=True))
+        with untracked():
+            super().delete_queryset(request, queryset)
+        update_transcripts_on_commit(pc_ids)
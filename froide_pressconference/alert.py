@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.urls import reverse
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
 from froide.helper.search.queryset import SearchQuerySetWrapper
@@ -18,11 +19,9 @@ class PressConferenceAlertConfiguration(AlertConfiguration):
         from .documents import PressConferenceDocument
         from .filters import PressConferenceFilterSet
         from .models import PressConference
+        from .views import attach_speech_hits
 
         s = PressConferenceDocument.search()
-        s = s.highlight_options(encoder="html", number_of_fragments=10).highlight(
-            "content"
-        )
         s = s.sort("-date")
         sqs = SearchQuerySetWrapper(s, PressConference)
 
@@ -34,7 +33,7 @@ class PressConferenceAlertConfiguration(AlertConfiguration):
         count = sqs.count()
         qs = sqs.to_queryset()
         qs = qs[:item_count]
-        queryset = sqs.wrap_queryset(qs)
+        queryset = attach_speech_hits(sqs.wrap_queryset(qs), query)
 
         return (
             count,
@@ -42,7 +41,9 @@ class PressConferenceAlertConfiguration(AlertConfiguration):
                 AlertEvent(
                     title=e.title,
                     url=e.get_absolute_domain_url(),
-                    content=e.query_highlight,
+                    content=mark_safe(
+                        " … ".join(hit.highlight for hit in e.speech_hits)
+                    ),
                 )
                 for e in queryset
             ],
@@ -8,11 +8,31 @@ class FroidePressconferenceConfig(AppConfig):
     verbose_name = _("Press Conferences")
 
     def ready(self):
+        from django.db.models.signals import post_delete, post_save, pre_delete
+
         from froide.foirequest.models import FoiRequest
+        from froide.publicbody.models import PublicBody
         from froide.searchalert import alert_registry
 
         from .alert import PressConferenceAlertConfiguration
-        from .listeners import create_link
+        from .listeners import (
+            create_link,
+            invalidate_publicbody_index,
+            mark_section_reindex,
+            mark_speaker_delete_reindex,
+            mark_speaker_reindex,
+            mark_speech_reindex,
+        )
+        from .models import Section, Speaker, Speech
 
         FoiRequest.request_sent.connect(create_link)
+        post_save.connect(invalidate_publicbody_index, sender=PublicBody)
+        post_delete.connect(invalidate_publicbody_index, sender=PublicBody)
+        # The loader deletes speeches without signals, see `delete_speeches`
+        post_save.connect(mark_speech_reindex, sender=Speech)
+        post_delete.connect(mark_speech_reindex, sender=Speech)
+        post_save.connect(mark_section_reindex, sender=Section)
+        post_delete.connect(mark_section_reindex, sender=Section)
+        post_save.connect(mark_speaker_reindex, sender=Speaker)
+        pre_delete.connect(mark_speaker_delete_reindex, sender=Speaker)
         alert_registry.register(PressConferenceAlertConfiguration())
@@ -1,4 +1,4 @@
-from django.db.models import Exists, OuterRef
+from django.db.models import Prefetch
 
 from django_elasticsearch_dsl import Document, fields
 
@@ -9,7 +9,7 @@ from froide.helper.search import (
     get_text_analyzer,
 )
 
-from .models import PressConference, Speaker, Speech
+from .models import PressConference, Section, Speech
 
 press_conference_index = get_index("pressconference")
 analyzer = get_text_analyzer()
@@ -23,6 +23,20 @@ class PressConferenceDocument(Document):
     category = fields.IntegerField(attr="category_id")
     speakers = fields.ListField(field=fields.KeywordField())
     topics = fields.ListField(field=fields.TextField())
+    speeches = fields.NestedField(
+        properties={
+            "text": fields.TextField(
+                analyzer=analyzer,
+                search_analyzer=search_analyzer,
+                search_quote_analyzer=search_quote_analyzer,
+                index_options="offsets",
+            ),
+            "speaker": fields.KeywordField(),
+            "kind": fields.KeywordField(),
+            "section": fields.IntegerField(),
+            "order": fields.IntegerField(),
+        }
+    )
 
     content = fields.TextField(
         analyzer=analyzer,
@@ -33,40 +47,50 @@ class PressConferenceDocument(Document):
 
     class Django:
         model = PressConference
+        # Prefetching needs a chunked iterator for `search_index`
+        queryset_pagination = 100
 
     def get_queryset(self):
+        # Two queries per chunk that only load the indexed columns of
+        # sections and speeches
         return (
             super()
             .get_queryset()
             .exclude(slug="")
-            .prefetch_related("sections", "sections__speeches")
+            .prefetch_related(
+                Prefetch(
+                    "sections",
+                    queryset=Section.objects.only("press_conference", "order"),
+                ),
+                Prefetch(
+                    "sections__speeches",
+                    queryset=Speech.objects.select_related("speaker").only(
+                        "section", "kind", "order", "text", "speaker__name"
+                    ),
+                ),
+            )
         )
 
     def prepare_speakers(self, obj):
-        return list(
-            Speaker.objects.filter(
-                Exists(
-                    Speech.objects.filter(
-                        speaker=OuterRef("id"), section__press_conference_id=obj.id
-                    )
-                )
-            ).values_list("name", flat=True)
-        )
+        return obj.speaker_names
+
+    def prepare_speeches(self, obj):
+        return [
+            {
+                "text": speech.text,
+                "speaker": speech.speaker.name if speech.speaker else "",
+                "kind": speech.kind,
+                "section": section.order,
+                "order": speech.order,
+            }
+            for section in obj.sections.all()
+            for speech in section.speeches.all()
+        ]
 
     def prepare_topics(self, obj):
         return obj.description.splitlines()
 
     def prepare_content(self, obj):
-        def get_section_content(section):
-            texts = []
-            for speech in section.speeches.all():
-                texts.append(speech.text)
-            return "\n\n".join(texts)
-
-        return (
-            obj.description
-            + "\n\n"
-            + "\n\n".join(
-                get_section_content(section) for section in obj.sections.all()
-            )
-        )
+        # Speech text assembled by the loader, see
+        # PressConference.update_transcript
+        return obj.description + "\n\n" + obj.content
@@ -21,6 +21,53 @@ def override_field_default(cls, field, overrides=None, extra=None):
     return res
 
 
+def get_search_query(query: str, fields: list[str], speech_hits: int = 0):
+    """
+    Match press conferences with all terms of `query` in `fields` and rank
+    them up by their best speech matching all terms.
+
+    With `speech_hits`, that many best matching speeches are returned as
+    inner hits with only their text highlighted.
+    """
+    speech_kwargs = {}
+    if speech_hits:
+        speech_kwargs["inner_hits"] = {
+            "size": speech_hits,
+            "_source": {"excludes": ["speeches.text"]},
+            "highlight": {
+                "encoder": "html",
+                "fields": {"speeches.text": {"number_of_fragments": 1}},
+            },
+        }
+    return ESQ(
+        "bool",
+        must=[
+            ESQ(
+                "simple_query_string",
+                query=query,
+                fields=fields,
+                default_operator="and",
+                lenient=True,
+            )
+        ],
+        should=[
+            ESQ(
+                "nested",
+                path="speeches",
+                score_mode="max",
+                query=ESQ(
+                    "simple_query_string",
+                    query=query,
+                    fields=["speeches.text"],
+                    default_operator="and",
+                    lenient=True,
+                ),
+                **speech_kwargs,
+            )
+        ],
+    )
+
+
 class PressConferenceFilterSet(BaseSearchFilterSet):
     date = django_filters.DateFromToRangeFilter(
         widget=DateRangeWidget, method="filter_date_range"
@@ -61,6 +108,11 @@ class PressConferenceFilterSet(BaseSearchFilterSet):
         super().__init__(*args, **kwargs)
         self.form.initial["facet_interval"] = "year"
 
+    def auto_query(self, qs, name, value):
+        if value:
+            return qs.set_query(get_search_query(value, self.query_fields))
+        return qs
+
     def filter_queryset(self, queryset):
         qs = super().filter_queryset(queryset)
         if not self.data.get("facet_interval"):
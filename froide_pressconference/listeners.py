@@ -1,6 +1,12 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
 from froide.foirequest.models import FoiRequest
 
 from .models import PressConference, Section
+from .sources.resolvers import publicbody_index
 
 FOIREQUEST_TAGS = "Regierungspressekonferenz"
 
@@ -43,3 +49,88 @@ def create_link(sender: FoiRequest, **kwargs):
 
     section.foirequests.add(sender)
     sender.tags.add(FOIREQUEST_TAGS)
+
+
+def invalidate_publicbody_index(sender, **kwargs):
+    publicbody_index.invalidate()
+
+
+# Set while the loader writes, it rebuilds the text columns itself
+tracking_disabled = ContextVar("tracking_disabled", default=False)
+
+
+@contextmanager
+def untracked():
+    """
+    Do not rebuild text columns or mark press conferences for reindexing
+    on saves and deletes in this block.
+    """
+    token = tracking_disabled.set(True)
+    try:
+        yield
+    finally:
+        tracking_disabled.reset(token)
+
+
+def update_transcripts_on_commit(pc_ids):
+    from .tasks import update_transcripts
+
+    pc_ids = list(pc_ids)
+    transaction.on_commit(lambda: update_transcripts(pc_ids))
+
+
+def get_speaker_pc_ids(speaker):
+    return list(
+        Section.objects.filter(speeches__speaker=speaker)
+        .values_list("press_conference_id", flat=True)
+        .distinct()
+    )
+
+
+def is_deleted_with(origin, models):
+    """
+    Whether a delete started from an instance or a queryset of `models`.
+    """
+    # `QuerySet.delete()` passes the queryset as origin
+    return issubclass(getattr(origin, "model", type(origin)), models)
+
+
+def mark_speech_reindex(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or tracking_disabled.get():
+        return
+    if is_deleted_with(origin, (PressConference, Section)):
+        # Deleted with its section, handled by `mark_section_reindex`
+        return
+    update_transcripts_on_commit(
+        Section.objects.filter(id=instance.section_id).values_list(
+            "press_conference_id", flat=True
+        )
+    )
+
+
+def mark_section_reindex(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or tracking_disabled.get():
+        return
+    if is_deleted_with(origin, PressConference):
+        # Deleted with its press conference, which leaves the index
+        return
+    update_transcripts_on_commit([instance.press_conference_id])
+
+
+def mark_speaker_reindex(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or tracking_disabled.get():
+        return
+    from .tasks import queue_update_transcripts
+
+    pc_ids = get_speaker_pc_ids(instance)
+    transaction.on_commit(lambda: queue_update_transcripts(pc_ids))
+
+
+def mark_speaker_delete_reindex(sender, instance, **kwargs):
+    # Speeches lose their speaker on delete, so collect them before
+    if tracking_disabled.get():
+        return
+    from .tasks import queue_update_transcripts
+
+    pc_ids = get_speaker_pc_ids(instance)
+    transaction.on_commit(lambda: queue_update_transcripts(pc_ids))
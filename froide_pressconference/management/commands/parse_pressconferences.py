@@ -0,0 +1,161 @@
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ...metrics import StageTimer
+from ...models import PressConference
+from ...sources.cvd_loader import (
+    CVDLoader,
+    PressConferenceWriter,
+    get_artifact_store,
+    needs_update,
+)
+from ...sources.resolvers import SpeakerResolver
+
+
+def parse_source_file(job):
+    """
+    Parse one source file in a worker process without touching the database.
+
+    Returns the press conference id with either the parse result, None if
+    the source and the grammar are unchanged, or an error message, and the
+    stage timings.
+    """
+    pc_id, file_name, source_hash, grammar_version, force = job
+    storage = PressConference._meta.get_field("source_file").storage
+    timer = StageTimer()
+    try:
+        with timer.stage("html_load"), storage.open(file_name) as f:
+            content = f.read()
+        loader = CVDLoader(content, artifacts=get_artifact_store(), timer=timer)
+        if not force and not needs_update(
+            source_hash, grammar_version, loader.source_hash
+        ):
+            return pc_id, None, None, timer.get_timings()
+        return pc_id, loader.parse_cached(file_name), None, timer.get_timings()
+    except Exception as e:
+        return pc_id, None, f"{type(e).__name__}: {e}", timer.get_timings()
+
+
+class Command(BaseCommand):
+    help = "Parse press conference source files in parallel and load them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", help="Slug of press conference category")
+        parser.add_argument("--date-from", type=date.fromisoformat)
+        parser.add_argument("--date-to", type=date.fromisoformat)
+        parser.add_argument(
+            "--unparsed",
+            action="store_true",
+            help="Only press conferences that have not been parsed yet",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Parse and write even if the source and grammar are unchanged",
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Replace all sections instead of writing only changed ones",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--chunksize", type=int, default=4)
+
+    def get_queryset(self, options):
+        qs = PressConference.objects.exclude(source_file="")
+        if options["category"]:
+            qs = qs.filter(category__slug=options["category"])
+        if options["date_from"]:
+            qs = qs.filter(date__date__gte=options["date_from"])
+        if options["date_to"]:
+            qs = qs.filter(date__date__lte=options["date_to"])
+        if options["unparsed"]:
+            qs = qs.filter(slug="")
+        return qs.order_by("date")
+
+    def handle(self, *args, **options):
+        # The writer only saves the transcript columns, never reads them
+        pcs = (
+            self.get_queryset(options)
+            .select_related("category__host")
+            .defer("content", "speaker_names")
+            .in_bulk()
+        )
+        jobs = [
+            (
+                pc.id,
+                pc.source_file.name,
+                pc.source_hash,
+                pc.grammar_version,
+                options["force"],
+            )
+            for pc in pcs.values()
+        ]
+        if not jobs:
+            return
+        self.stdout.write(
+            f"Parsing {len(jobs)} press conferences with {options['workers']} workers"
+        )
+
+        writer = PressConferenceWriter(SpeakerResolver())
+        parsed_count = 0
+        speech_count = 0
+        skipped = 0
+        failed = 0
+        # Stage times summed over all conferences, parse stages run in workers
+        stage_times = defaultdict(float)
+        start = time.perf_counter()
+
+        # Workers must not inherit open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=django.setup
+        ) as executor:
+            results = executor.map(
+                parse_source_file, jobs, chunksize=options["chunksize"]
+            )
+            for pc_id, parsed, error, timings in results:
+                pc = pcs[pc_id]
+                for name, value in timings.items():
+                    stage_times[name] += value
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"Failed to parse {pc_id}: {error}")
+                    continue
+                if parsed is None:
+                    skipped += 1
+                    continue
+                writer.timer = StageTimer()
+                try:
+                    writer.load(pc, parsed, bulk=options["bulk"])
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Failed to load {pc_id}: {e}")
+                    continue
+                writer.report.timings.update(timings)
+                writer.report.emit()
+                for name, value in writer.timer.timings.items():
+                    stage_times[name] += value
+                parsed_count += 1
+                speech_count += writer.report.parsed_speeches
+
+        duration = time.perf_counter() - start
+        self.stdout.write(
+            f"Loaded {parsed_count}, skipped {skipped}, failed {failed} "
+            f"in {duration:.1f}s "
+            f"({parsed_count / duration:.2f} conferences/s, "
+            f"{speech_count / duration:.1f} speeches/s)"
+        )
+        self.stdout.write(
+            "Stage times: "
+            + ", ".join(
+                f"{name} {value:.1f}s" for name, value in sorted(stage_times.items())
+            )
+        )
@@ -0,0 +1,126 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from ...documents import PressConferenceDocument
+from ...models import PressConference
+
+
+class Command(BaseCommand):
+    help = "Index press conferences in chunks with parallel bulk requests"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=100, help="Press conferences per chunk"
+        )
+        parser.add_argument(
+            "--max-speeches",
+            type=int,
+            default=20000,
+            help="Speeches per chunk at most, limits memory use",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Parallel bulk requests"
+        )
+        parser.add_argument(
+            "--from-id", type=int, help="Start after this press conference id"
+        )
+        parser.add_argument(
+            "--state-file",
+            help="File to store the last indexed id in and resume from",
+        )
+
+    def get_start_id(self, options):
+        if options["from_id"] is not None:
+            return options["from_id"]
+        if options["state_file"]:
+            path = Path(options["state_file"])
+            if path.exists():
+                return int(path.read_text().strip() or 0)
+        return 0
+
+    def iter_chunks(self, last_id, chunk_size, max_speeches):
+        """
+        Yield lists of press conference ids in id order.
+
+        A chunk ends after `chunk_size` press conferences or before it would
+        exceed `max_speeches`, but has at least one press conference.
+        """
+        while True:
+            candidates = list(
+                PressConference.objects.exclude(slug="")
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .annotate(speech_count=Count("sections__speeches"))
+                .values_list("id", "speech_count")[:chunk_size]
+            )
+            if not candidates:
+                return
+            chunk = []
+            speech_total = 0
+            for pc_id, speech_count in candidates:
+                if chunk and speech_total + speech_count > max_speeches:
+                    break
+                chunk.append(pc_id)
+                speech_total += speech_count
+            yield chunk
+            last_id = chunk[-1]
+
+    def handle(self, *args, **options):
+        doc = PressConferenceDocument()
+        start_id = self.get_start_id(options)
+        if start_id:
+            self.stdout.write(f"Resuming after id {start_id}")
+
+        indexed = 0
+        errors = 0
+        start = time.perf_counter()
+        # (last id of chunk, future) in id order, the state file only moves
+        # past chunks whose requests and all earlier ones are done
+        pending = deque()
+
+        def complete(wait):
+            nonlocal indexed, errors
+            while pending and (wait or pending[0][1].done()):
+                last_id, future = pending.popleft()
+                success, failed = future.result()
+                indexed += success
+                errors += len(failed)
+                if options["state_file"]:
+                    Path(options["state_file"]).write_text(str(last_id))
+                duration = time.perf_counter() - start
+                self.stdout.write(
+                    f"Indexed {indexed} up to id {last_id} "
+                    f"({indexed / duration:.1f} docs/s)"
+                )
+                wait = False
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            chunks = self.iter_chunks(
+                start_id, options["chunk_size"], options["max_speeches"]
+            )
+            for chunk in chunks:
+                # Keep at most one chunk per worker in memory
+                while len(pending) >= options["workers"]:
+                    complete(wait=True)
+                objects = doc.get_queryset().filter(id__in=chunk).order_by("id")
+                actions = list(doc.get_actions(objects, "index"))
+                pending.append(
+                    (
+                        chunk[-1],
+                        executor.submit(doc.bulk, actions, raise_on_error=False),
+                    )
+                )
+                complete(wait=False)
+            while pending:
+                complete(wait=True)
+
+        duration = time.perf_counter() - start
+        self.stdout.write(
+            f"Indexed {indexed} press conferences with {errors} errors "
+            f"in {duration:.1f}s ({indexed / duration:.1f} docs/s)"
+        )
@@ -0,0 +1,151 @@
+import functools
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "pressconference.parse"
+
+
+class StageTimer:
+    """
+    Sums up the time spent in named stages of a run.
+
+    Stages can be nested, time spent in an inner stage is only counted for
+    the inner stage. Generators are timed with `iter`, which counts the time
+    spent producing each item. Stages must not be open across a `yield`.
+    """
+
+    def __init__(self, timings: dict[str, float] | None = None):
+        self.timings: defaultdict[str, float] = defaultdict(float)
+        if timings:
+            self.timings.update(timings)
+        # Time spent in nested stages for each open stage
+        self.nested: list[float] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        self.nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] += elapsed - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += elapsed
+
+    def iter(self, name: str, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def get_timings(self) -> dict[str, float]:
+        return dict(self.timings)
+
+
+class LoggingMetricsHook:
+    """
+    Logs stage timings and counters of a parse run as one line.
+    """
+
+    def report(self, timings: dict[str, float], counters: dict[str, int]):
+        logger.info(
+            "Parse metrics: %s %s",
+            " ".join(f"{name}={value:.3f}s" for name, value in timings.items()),
+            " ".join(f"{name}={value}" for name, value in counters.items()),
+        )
+
+
+class StatsdMetricsHook:
+    """
+    Sends stage timings and counters to statsd.
+
+    Needs the `statsd` package unless a client is given.
+    """
+
+    def __init__(self, client=None, prefix: str = METRICS_PREFIX):
+        if client is None:
+            from statsd import StatsClient
+
+            client = StatsClient(
+                getattr(settings, "STATSD_HOST", "localhost"),
+                getattr(settings, "STATSD_PORT", 8125),
+            )
+        self.client = client
+        self.prefix = prefix
+
+    def report(self, timings: dict[str, float], counters: dict[str, int]):
+        with self.client.pipeline() as pipe:
+            for name, value in timings.items():
+                pipe.timing(f"{self.prefix}.{name}", value * 1000)
+            for name, value in counters.items():
+                pipe.incr(f"{self.prefix}.{name}", value)
+
+
+class PrometheusMetricsHook:
+    """
+    Records stage timings and counters in Prometheus metrics.
+
+    Needs the `prometheus_client` package.
+    """
+
+    def __init__(self, prefix: str = METRICS_PREFIX):
+        from prometheus_client import Counter, Histogram
+
+        prefix = prefix.replace(".", "_")
+        self.stage_seconds = Histogram(
+            f"{prefix}_stage_seconds", "Time spent per parse stage", ["stage"]
+        )
+        self.counter = Counter(
+            f"{prefix}_items", "Counted items of parse runs", ["kind"]
+        )
+
+    def report(self, timings: dict[str, float], counters: dict[str, int]):
+        for name, value in timings.items():
+            self.stage_seconds.labels(stage=name).observe(value)
+        for name, value in counters.items():
+            self.counter.labels(kind=name).inc(value)
+
+
+@functools.cache
+def get_metrics_hook():
+    hook_path = getattr(
+        settings,
+        "PRESSCONFERENCE_METRICS_HOOK",
+        "froide_pressconference.metrics.LoggingMetricsHook",
+    )
+    return import_string(hook_path)()
+
+
+def report_metrics(timings: dict[str, float], counters: dict[str, int]):
+    try:
+        get_metrics_hook().report(timings, counters)
+    except Exception:
+        # Metrics must never break parsing
+        logger.exception("Could not report parse metrics")
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts queries,
+    see `connection.execute_wrapper`.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
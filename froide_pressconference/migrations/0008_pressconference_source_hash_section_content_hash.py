@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('froide_pressconference', '0007_flag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pressconference',
+            name='source_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='source hash'),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='content hash'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('froide_pressconference', '0008_pressconference_source_hash_section_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pressconference',
+            name='source_url',
+            field=models.URLField(blank=True, db_index=True, verbose_name='source URL'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-17 12:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('froide_pressconference', '0009_alter_pressconference_source_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.UUIDField(blank=True, null=True, verbose_name='run id')),
+                ('last_page', models.PositiveIntegerField(default=0, verbose_name='last page')),
+                ('last_url', models.URLField(blank=True, verbose_name='last URL')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='started at')),
+                ('updated_at', models.DateTimeField(blank=True, null=True, verbose_name='updated at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='locked until')),
+                ('stop_after_known_pages', models.PositiveIntegerField(blank=True, null=True, verbose_name='stop after known pages')),
+                ('date_from', models.DateField(blank=True, null=True, verbose_name='date from')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='crawl_state', to='froide_pressconference.pressconferencecategory', verbose_name='category')),
+            ],
+            options={
+                'verbose_name': 'crawl state',
+                'verbose_name_plural': 'crawl states',
+            },
+        ),
+    ]
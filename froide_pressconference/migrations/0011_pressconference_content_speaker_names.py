@@ -0,0 +1,43 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+def fill_transcripts(apps, schema_editor):
+    PressConference = apps.get_model('froide_pressconference', 'PressConference')
+    press_conferences = PressConference.objects.prefetch_related(
+        'sections', 'sections__speeches__speaker'
+    )
+    for pc in press_conferences.iterator(chunk_size=100):
+        section_texts = []
+        speakers = {}
+        for section in pc.sections.all():
+            speeches = section.speeches.all()
+            section_texts.append('\n\n'.join(speech.text for speech in speeches))
+            for speech in speeches:
+                if speech.speaker is not None:
+                    speakers.setdefault(speech.speaker.id, speech.speaker.name)
+        pc.content = '\n\n'.join(section_texts)
+        pc.speaker_names = list(speakers.values())
+        pc.save(update_fields=['content', 'speaker_names'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('froide_pressconference', '0010_crawlstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pressconference',
+            name='content',
+            field=models.TextField(blank=True, editable=False, verbose_name='content'),
+        ),
+        migrations.AddField(
+            model_name='pressconference',
+            name='speaker_names',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='speaker names'),
+        ),
+        migrations.RunPython(fill_transcripts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-17 17:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('froide_pressconference', '0011_pressconference_content_speaker_names'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingReindex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pressconference_id', models.PositiveBigIntegerField(unique=True, verbose_name='press conference id')),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='marked at')),
+            ],
+            options={
+                'verbose_name': 'pending reindex',
+                'verbose_name_plural': 'pending reindexes',
+            },
+        ),
+    ]
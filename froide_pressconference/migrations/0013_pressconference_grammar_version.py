@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+def set_loaded_grammar_version(apps, schema_editor):
+    PressConference = apps.get_model('froide_pressconference', 'PressConference')
+    # Sources with a hash were loaded with the first grammar version
+    PressConference.objects.exclude(source_hash='').update(grammar_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('froide_pressconference', '0012_pendingreindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pressconference',
+            name='grammar_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='grammar version'),
+        ),
+        migrations.RunPython(set_loaded_grammar_version, migrations.RunPython.noop),
+    ]
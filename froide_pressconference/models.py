@@ -1,7 +1,9 @@
+import uuid
+from datetime import timedelta
 from urllib.parse import quote, urlencode
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.formats import date_format
@@ -40,9 +42,19 @@ class PressConference(models.Model):
     title = models.CharField(_("title"), max_length=255, blank=True)
     slug = models.SlugField(_("slug"), blank=True)
     description = models.TextField(_("description"), blank=True)
-    source_url = models.URLField(_("source URL"), blank=True)
+    source_url = models.URLField(_("source URL"), blank=True, db_index=True)
     source_file = models.FileField(blank=True, upload_to="pressconferences")
+    source_hash = models.CharField(
+        _("source hash"), max_length=64, blank=True, editable=False
+    )
+    grammar_version = models.PositiveIntegerField(
+        _("grammar version"), default=0, editable=False
+    )
     date = models.DateTimeField(_("date"), default=timezone.now)
+    content = models.TextField(_("content"), blank=True, editable=False)
+    speaker_names = models.JSONField(
+        _("speaker names"), default=list, blank=True, editable=False
+    )
 
     class Meta:
         verbose_name = _("press conference")
@@ -75,6 +87,50 @@ class PressConference(models.Model):
             "\n", "<li>{}</li>", ((line,) for line in self.description.splitlines())
         )
 
+    def set_transcript(self):
+        """
+        Set `content` and `speaker_names` from the stored speeches.
+        """
+        sections = self.sections.all().prefetch_related("speeches__speaker")
+        transcript = TranscriptBuilder()
+        for section in sections:
+            transcript.add_section(section.speeches.all())
+        transcript.apply(self)
+
+    def update_transcript(self):
+        """
+        Rebuild `content` and `speaker_names` from the stored speeches.
+
+        Saved with an update that sends no signals, the search document is
+        updated through `PendingReindex`.
+        """
+        self.set_transcript()
+        PressConference.objects.filter(id=self.id).update(
+            content=self.content, speaker_names=self.speaker_names
+        )
+
+
+class TranscriptBuilder:
+    """
+    Assembles the full text and the distinct speaker names of a press
+    conference section by section.
+    """
+
+    def __init__(self):
+        self.section_texts = []
+        self.speakers = {}
+
+    def add_section(self, speeches):
+        self.section_texts.append("\n\n".join(speech.text for speech in speeches))
+        for speech in speeches:
+            if speech.speaker is not None:
+                self.speakers.setdefault(speech.speaker.id, speech.speaker.name)
+
+    def apply(self, pc: PressConference):
+        # The description is added when indexing, it can be edited
+        pc.content = "\n\n".join(self.section_texts)
+        pc.speaker_names = list(self.speakers.values())
+
 
 class Topic(models.Model):
     name = models.CharField(_("name"), max_length=255)
@@ -128,6 +184,9 @@ class Section(models.Model):
     foirequests = models.ManyToManyField(
         FoiRequest, blank=True, verbose_name=_("related FOI requests")
     )
+    content_hash = models.CharField(
+        _("content hash"), max_length=64, blank=True, editable=False
+    )
 
     class Meta:
         verbose_name = _("section")
@@ -144,6 +203,40 @@ class Section(models.Model):
         return f"{self.press_conference.get_absolute_url()}#section-{self.order}"
 
 
+class PendingReindex(models.Model):
+    """
+    A press conference whose search document is outdated after an edit.
+
+    Edits only add or touch a row, `reindex_pending_task` updates every
+    press conference once. The id is no foreign key, so rows of deleted
+    press conferences do not block their deletion.
+    """
+
+    pressconference_id = models.PositiveBigIntegerField(
+        _("press conference id"), unique=True
+    )
+    marked_at = models.DateTimeField(_("marked at"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("pending reindex")
+        verbose_name_plural = _("pending reindexes")
+
+    def __str__(self):
+        return str(self.pressconference_id)
+
+    @classmethod
+    def add(cls, pc_ids):
+        # Marking again moves `marked_at`, so a reindex that read the press
+        # conference before keeps the row
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [cls(pressconference_id=pc_id, marked_at=now) for pc_id in set(pc_ids)],
+            update_conflicts=True,
+            unique_fields=["pressconference_id"],
+            update_fields=["marked_at"],
+        )
+
+
 class FlagKind(models.TextChoices):
     UNANSWERED = "unanswered", _("unanswered")
 
@@ -159,6 +252,107 @@ class Flag(models.Model):
         verbose_name_plural = _("Flag")
 
 
+class CrawlLockLost(Exception):
+    pass
+
+
+class CrawlState(models.Model):
+    """
+    Progress of the crawl of a category and the lock that lets only one
+    crawl per category run at a time.
+
+    The lock expires when the crawl has not saved progress for
+    `CVD_CRAWL_LOCK_TIMEOUT` seconds, so a crashed crawl does not block
+    later runs.
+    """
+
+    category = models.OneToOneField(
+        PressConferenceCategory,
+        verbose_name=_("category"),
+        on_delete=models.CASCADE,
+        related_name="crawl_state",
+    )
+    run_id = models.UUIDField(_("run id"), null=True, blank=True)
+    last_page = models.PositiveIntegerField(_("last page"), default=0)
+    last_url = models.URLField(_("last URL"), blank=True)
+    started_at = models.DateTimeField(_("started at"), null=True, blank=True)
+    updated_at = models.DateTimeField(_("updated at"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("finished at"), null=True, blank=True)
+    locked_until = models.DateTimeField(_("locked until"), null=True, blank=True)
+    # Limits of the run, a resumed run keeps those of the run it continues
+    stop_after_known_pages = models.PositiveIntegerField(
+        _("stop after known pages"), null=True, blank=True
+    )
+    date_from = models.DateField(_("date from"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("crawl state")
+        verbose_name_plural = _("crawl states")
+
+    def __str__(self):
+        return f"{self.category} ({self.last_page})"
+
+    @classmethod
+    def get_lock_timeout(cls):
+        return timedelta(seconds=getattr(settings, "CVD_CRAWL_LOCK_TIMEOUT", 30 * 60))
+
+    @classmethod
+    def acquire(cls, category, stop_after_known_pages=None, date_from=None):
+        """
+        Start a crawl run for `category`.
+
+        A new walk from the first page stores `stop_after_known_pages` and
+        `date_from`, a resumed one keeps them. Returns the crawl state with
+        a new run id, or None if another run holds the lock.
+        """
+        cls.objects.get_or_create(category=category)
+        with transaction.atomic():
+            # The row lock makes concurrent runs wait and then see the lease
+            state = cls.objects.select_for_update().get(category=category)
+            now = timezone.now()
+            if state.locked_until is not None and state.locked_until >= now:
+                return None
+            state.run_id = uuid.uuid4()
+            state.locked_until = now + cls.get_lock_timeout()
+            if state.finished_at or not state.last_page:
+                # The last run completed, start from the first page
+                state.last_page = 0
+                state.last_url = ""
+                state.started_at = now
+                state.finished_at = None
+                state.stop_after_known_pages = stop_after_known_pages
+                state.date_from = date_from
+            state.save()
+        return state
+
+    def get_resume_page(self) -> int:
+        # Downloads of the page before may still have been running, and new
+        # results only push older ones to later pages
+        return max(self.last_page - 1, 1)
+
+    def get_run_queryset(self):
+        return CrawlState.objects.filter(id=self.id, run_id=self.run_id)
+
+    async def asave_progress(self, page: int, url: str):
+        now = timezone.now()
+        updated = await self.get_run_queryset().aupdate(
+            last_page=page,
+            last_url=url,
+            updated_at=now,
+            locked_until=now + self.get_lock_timeout(),
+        )
+        if not updated:
+            raise CrawlLockLost(f"Crawl {self.run_id} of {self.category_id} lost lock")
+        self.last_page = page
+        self.last_url = url
+
+    def finish(self):
+        self.get_run_queryset().update(finished_at=timezone.now())
+
+    def release(self):
+        self.get_run_queryset().update(locked_until=None)
+
+
 class SpeechKind(models.TextChoices):
     SIDENOTE = "sidenote", _("Sidenote")
     QUESTION = "question", _("Question")
@@ -0,0 +1,97 @@
+"""
+Micro-benchmarks of the parsing fast paths against the implementations
+they replace. They need no database:
+
+    python -m froide_pressconference.sources.benchmark grammar FILE [--number N]
+    python -m froide_pressconference.sources.benchmark text [--number N]
+
+`FILE` holds transcript text with paragraphs separated by blank lines,
+like the files in `tests/fixtures`. The text benchmark runs on generated
+nested markup.
+"""
+
+import argparse
+import timeit
+from functools import partial
+from pathlib import Path
+
+from lxml import html as etree
+
+from .cvd_fastparse import iter_parse, join_paragraphs, parse_fast
+from .cvd_grammar import bpk_grammar
+from .cvd_text import clean_text, extract_text
+
+
+def extract_text_recursive(el):
+    # Previous implementation of `extract_text`, also the test reference
+    result = []
+    if el.text:
+        result.append(el.text)
+    for child in el:
+        result.append(extract_text_recursive(child))
+        if child.tag in ("p", "br", "li"):
+            result.append("\n")
+        if child.tail:
+            result.append(child.tail)
+    return clean_text("".join(result))
+
+
+def make_nested(depth, tag="span"):
+    root = el = etree.Element("div")
+    for i in range(depth):
+        child = etree.Element(tag)
+        el.append(child)
+        child.text = f" Text {i} "
+        child.tail = " "
+        el = child
+    return root
+
+
+def time_per_run(func, number: int) -> float:
+    return timeit.timeit(func, number=number) / number
+
+
+def benchmark_grammar(path: Path, number: int):
+    paragraphs = path.read_text().split("\n\n")
+    text = join_paragraphs(paragraphs)
+    timings = {
+        "bpk_grammar": time_per_run(
+            lambda: bpk_grammar.parse_string(text, parse_all=True).as_list(), number
+        ),
+        "parse_fast": time_per_run(lambda: parse_fast(text), number),
+        "iter_parse": time_per_run(lambda: list(iter_parse(paragraphs)), number),
+    }
+    baseline = timings["bpk_grammar"]
+    for name, value in timings.items():
+        print(f"{name:<12} {value * 1000:8.2f}ms {baseline / value:6.1f}x")
+
+
+def benchmark_text(number: int):
+    for depth in (10, 100, 500):
+        for tag in ("span", "p"):
+            el = make_nested(depth, tag)
+            recursive = time_per_run(partial(extract_text_recursive, el), number)
+            iterative = time_per_run(partial(extract_text, el), number)
+            print(
+                f"depth {depth:>4} <{tag}>: recursive {recursive * 1000:.2f}ms, "
+                f"iterative {iterative * 1000:.2f}ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsing fast paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+    grammar = commands.add_parser("grammar", help="bpk_grammar against fast paths")
+    grammar.add_argument("file", type=Path)
+    grammar.add_argument("--number", type=int, default=10)
+    text = commands.add_parser("text", help="extract_text on nested markup")
+    text.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    if args.command == "grammar":
+        benchmark_grammar(args.file, args.number)
+    elif args.command == "text":
+        benchmark_text(args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import gzip
+import json
+from dataclasses import dataclass
+from datetime import datetime as dt
+from pathlib import PurePosixPath
+
+from .cvd_grammar import GRAMMAR_VERSION
+
+ARTIFACT_FORMAT = 1
+ARTIFACT_SUFFIX = ".parsed.json.gz"
+
+
+@dataclass
+class ParsedPressConference:
+    """
+    Plain parse result of a transcript that can be passed between processes.
+
+    `items` are the grammar items as (kind, text) pairs, see
+    `cvd_loader.ITEM_KINDS`.
+    """
+
+    source_hash: str
+    date: dt
+    topics: list[str]
+    items: list[tuple[str, str]]
+
+
+def dump_parsed(parsed: ParsedPressConference) -> bytes:
+    data = {
+        "format": ARTIFACT_FORMAT,
+        "grammar": GRAMMAR_VERSION,
+        "source_hash": parsed.source_hash,
+        "date": parsed.date.isoformat() if parsed.date else None,
+        "topics": parsed.topics,
+        "items": [[kind, text] for kind, text in parsed.items],
+    }
+    content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return gzip.compress(content.encode("utf-8"), mtime=0)
+
+
+def load_parsed(content: bytes, source_hash: str) -> ParsedPressConference | None:
+    """
+    Read an artifact written by `dump_parsed`.
+
+    Returns None if it was written by another grammar version or for
+    another source.
+    """
+    data = json.loads(gzip.decompress(content))
+    if data.get("format") != ARTIFACT_FORMAT:
+        return None
+    if data.get("grammar") != GRAMMAR_VERSION:
+        return None
+    if data.get("source_hash") != source_hash:
+        return None
+    return ParsedPressConference(
+        source_hash=data["source_hash"],
+        date=dt.fromisoformat(data["date"]) if data["date"] else None,
+        topics=data["topics"],
+        items=[(kind, text) for kind, text in data["items"]],
+    )
+
+
+def get_artifact_name(source_name: str) -> str:
+    return str(PurePosixPath(source_name).with_suffix(ARTIFACT_SUFFIX))
@@ -0,0 +1,272 @@
+import re
+from collections.abc import Iterable, Iterator
+
+from pyparsing import Located, Opt, ParseException
+
+from .cvd_grammar import (
+    QuestionItem,
+    SideNoteItem,
+    SpeakerItem,
+    SpeechItem,
+    bpk_grammar,
+    colon,
+    function_speaker,
+    intro,
+    ministry_speaker,
+    name_speaker,
+    question_re,
+    sb,
+    speaker_section,
+)
+
+COLLAPSE_2NL = re.compile(r"\n\n\n+")
+CLOSING_BRACKET = re.compile(r"[\)\]]")
+ZURUF_GROUP_END = re.compile(r"[: ]")
+
+
+def atomic(pattern: str) -> str:
+    # pyparsing never backtracks into an element once it matched, an atomic
+    # group gives a regex element the same semantics
+    return f"(?>{pattern})"
+
+
+def first_of(*patterns: str) -> str:
+    # Same as pyparsing's MatchFirst: the first matching alternative wins
+    return atomic("|".join(atomic(p) for p in patterns))
+
+
+SB = atomic(sb.expr.pattern)
+COLON = atomic(colon.expr.pattern)
+LINE = atomic(r"[^\n]+")
+QUESTION = atomic(f"(?i:{question_re})")
+SPEAKER = first_of(ministry_speaker.pattern, function_speaker.pattern)
+SPEAKER_PREFIX = first_of(
+    ministry_speaker.pattern, function_speaker.pattern, name_speaker.pattern
+)
+
+# The alternatives of `body_elements` in the same order, one regex each
+BODY_ALTERNATIVES = [
+    (
+        r"(?>[(\[])(?P<sidenote>(?>[^\]\)]+))(?>[\)\]])" + SB,
+        [(SideNoteItem, "sidenote")],
+    ),
+    (
+        r"(?P<zuruf>(?>Zuruf(?: [^: ]+)?: ?[^\n]+))" + SB,
+        [(SideNoteItem, "zuruf")],
+    ),
+    (
+        f"(?P<question_prefix>{QUESTION}){COLON}(?P<question_prefix_speech>{LINE}){SB}",
+        [(QuestionItem, "question_prefix"), (SpeechItem, "question_prefix_speech")],
+    ),
+    (
+        f"(?P<speaker_prefix>{SPEAKER_PREFIX}){COLON}(?P<speaker_prefix_speech>{LINE}){SB}",
+        [(SpeakerItem, "speaker_prefix"), (SpeechItem, "speaker_prefix_speech")],
+    ),
+    (
+        f"(?P<question>{QUESTION}){SB}(?P<question_speech>{LINE}){SB}",
+        [(QuestionItem, "question"), (SpeechItem, "question_speech")],
+    ),
+    (
+        f"(?P<speaker>{SPEAKER}){SB}(?P<speaker_speech>{LINE}){SB}",
+        [(SpeakerItem, "speaker"), (SpeechItem, "speaker_speech")],
+    ),
+    (
+        f"(?P<speech>{LINE}){SB}",
+        [(SpeechItem, "speech")],
+    ),
+]
+
+BODY_RE = re.compile("|".join(f"(?:{pattern})" for pattern, _ in BODY_ALTERNATIVES))
+# Each alternative ends with its last named group, so `lastgroup` tells
+# which alternative matched
+BODY_ITEMS = {items[-1][1]: items for _, items in BODY_ALTERNATIVES}
+
+# The intro with a leading sidenote, as `bpk_grammar` parses it, for
+# `parse_fast`
+located_intro = Located(intro)
+located_speaker_section = Located(Opt(speaker_section + sb))
+
+
+class ParagraphParseException(ParseException):
+    def __init__(self, pstr: str, loc: int, paragraph_index: int):
+        super().__init__(pstr, loc, f"Could not parse paragraph {paragraph_index}")
+        self.paragraph_index = paragraph_index
+
+
+def join_paragraphs(paragraphs: Iterable[str]) -> str:
+    content = "\n\n".join(paragraphs).strip()
+    return COLLAPSE_2NL.sub("\n\n", content).strip() + "\n\n"
+
+
+def match_body_element(text: str, pos: int):
+    """
+    Match one body element at `pos`.
+
+    Returns the produced items and the end position, or None if no
+    alternative of `body_elements` matches.
+    """
+    match = BODY_RE.match(text, pos)
+    if match is None:
+        return None
+    items = BODY_ITEMS[match.lastgroup]
+    return [item_class([match.group(name)]) for item_class, name in items], match.end()
+
+
+def parse_fast(text: str) -> list:
+    """
+    Parse `text` into the same item list as
+    `bpk_grammar.parse_string(text, parse_all=True).as_list()`.
+
+    Only the intro goes through pyparsing, the body is matched with one
+    compiled regex per element. If the body does not match up to the end of
+    the text, the whole text is handed to `bpk_grammar`, which produces the
+    result or the usual ParseException.
+
+    The loader streams with `iter_parse` instead. This whole-text version is
+    the reference that the equivalence tests and `sources/benchmark.py`
+    compare with.
+    """
+    intro_result = located_intro.parse_string(text)
+    result = intro_result.value.as_list()
+    pos = intro_result.locn_end
+    body_count = 0
+    while pos < len(text):
+        matched = match_body_element(text, pos)
+        if matched is None:
+            break
+        items, pos = matched
+        result.extend(items)
+        body_count += 1
+    if pos < len(text) or body_count == 0:
+        return bpk_grammar.parse_string(text, parse_all=True).as_list()
+    return result
+
+
+def iter_normalized(paragraphs: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """
+    Produce the text of `join_paragraphs` piece by piece.
+
+    Yields the paragraph index with the text it adds. Trailing whitespace
+    is held back until the next paragraph shows whether it is inside the
+    text or stripped at its end. The final line break is not included.
+    """
+    pending = ""
+    started = False
+    for index, paragraph in enumerate(paragraphs):
+        data = pending + ("\n\n" if index else "") + paragraph
+        if not started:
+            data = data.lstrip()
+        stripped = data.rstrip()
+        pending = data[len(stripped) :]
+        if stripped:
+            started = True
+            yield index, COLLAPSE_2NL.sub("\n\n", stripped)
+
+
+def skip_lines(text: str, pos: int, count: int) -> int | None:
+    """
+    Return the position after `count` lines and their line breaks, or None
+    if the text ends before the line break run is known to be complete.
+    """
+    for _ in range(count):
+        pos = text.find("\n", pos)
+        if pos == -1:
+            return None
+        while pos < len(text) and text[pos] == "\n":
+            pos += 1
+        if pos >= len(text):
+            return None
+    return pos
+
+
+def is_intro_decided(text: str) -> bool:
+    # The speaker section ends at the second paragraph break at the latest
+    if len(text) >= 8 and not text.startswith("Sprecher"):
+        return True
+    first = text.find("\n\n")
+    if first == -1:
+        return False
+    second = text.find("\n\n", first + 2)
+    return second != -1 and second + 2 < len(text)
+
+
+def is_body_element_decided(text: str, pos: int) -> bool:
+    """
+    Check that more text cannot change which body element matches at `pos`.
+
+    All alternatives look at two lines at most, except sidenotes in
+    brackets and "Zuruf" sidenotes, which can span lines.
+    """
+    if skip_lines(text, pos, 2) is None:
+        return False
+    if text[pos] in "([":
+        closing = CLOSING_BRACKET.search(text, pos + 1)
+        if closing is None or closing.start() + 2 >= len(text):
+            return False
+    if text.startswith("Zuruf", pos):
+        group_end = ZURUF_GROUP_END.search(text, pos + 6)
+        if group_end is None or skip_lines(text, group_end.start(), 1) is None:
+            return False
+    return True
+
+
+def iter_parse(paragraphs: Iterable[str]) -> Iterator:
+    """
+    Parse paragraphs as they come in and yield the items of
+    `parse_fast(join_paragraphs(paragraphs))`.
+
+    Only text that can still influence the next element is kept in memory.
+    If the text does not parse, ParagraphParseException names the paragraph
+    that failed.
+    """
+    buffer = ""
+    pos = 0
+    # (position in buffer, paragraph index) of paragraphs still in buffer
+    starts = []
+    intro_done = False
+    body_count = 0
+    intro_sidenote = False
+
+    def fail():
+        index = next(index for start, index in reversed(starts) if start <= pos)
+        raise ParagraphParseException(buffer, pos, index)
+
+    def scan(final):
+        nonlocal pos, intro_done, body_count, intro_sidenote
+        if not intro_done:
+            if not final and not is_intro_decided(buffer):
+                return
+            intro_result = located_speaker_section.parse_string(buffer)
+            yield from intro_result.value.as_list()
+            pos = intro_result.locn_end
+            intro_done = True
+        while pos < len(buffer):
+            if not final and not is_body_element_decided(buffer, pos):
+                return
+            matched = match_body_element(buffer, pos)
+            if matched is None:
+                fail()
+            items, end = matched
+            if body_count == 0 and isinstance(items[0], SideNoteItem):
+                # bpk_grammar takes a leading sidenote into the intro
+                intro_sidenote = True
+            body_count += 1
+            pos = end
+            yield from items
+
+    for index, text in iter_normalized(paragraphs):
+        buffer = buffer[pos:]
+        starts = [(start - pos, i) for start, i in starts]
+        while len(starts) > 1 and starts[1][0] <= 0:
+            starts.pop(0)
+        pos = 0
+        starts.append((len(buffer), index))
+        buffer += text
+        yield from scan(final=False)
+
+    if not starts:
+        starts.append((0, 0))
+    buffer += "\n\n"
+    yield from scan(final=True)
+    if body_count - intro_sidenote < 1:
+        fail()
@@ -2,6 +2,10 @@ import re
 
 from pyparsing import Group, Opt, ParserElement, Regex, Suppress
 
+# Increase whenever a change to the grammar or the text extraction changes
+# parse results, stored parse artifacts of older versions are then ignored
+GRAMMAR_VERSION = 1
+
 
 class BodyItem:
     def __init__(self, value):
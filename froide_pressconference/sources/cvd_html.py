@@ -0,0 +1,58 @@
+import gzip
+import hashlib
+
+from lxml import html as etree
+
+from .cvd_text import extract_text
+
+# Elements of a transcript page that the loader reads
+KEEP_XPATHS = ("//p[@class='date']", "//div[@class='basepage_pages']")
+
+GZIP_MAGIC = b"\x1f\x8b"
+COMPRESSED_SUFFIX = ".gz"
+
+
+def trim_html(content: str) -> str:
+    """
+    Reduce a transcript page to the date and the main content.
+
+    Pages without main content are kept as they are.
+    """
+    doc = etree.fromstring(content)
+    parts = []
+    for xpath in KEEP_XPATHS:
+        els = doc.xpath(xpath)
+        if els:
+            parts.append(etree.tostring(els[0], encoding="unicode", with_tail=False))
+    if len(parts) < len(KEEP_XPATHS):
+        return content
+    return (
+        f'<html><head><meta charset="utf-8"></head><body>{"".join(parts)}</body></html>'
+    )
+
+
+def get_transcript_hash(content: str | bytes) -> str:
+    """
+    Hash the text of the date and the main content of a transcript page.
+
+    Pages that differ only in markup or page chrome get the same hash.
+    """
+    doc = etree.fromstring(content)
+    texts = []
+    for xpath in KEEP_XPATHS:
+        els = doc.xpath(xpath)
+        texts.append(extract_text(els[0]) if els else "")
+    return hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+
+
+def compress_html(content: str) -> bytes:
+    return gzip.compress(content.encode("utf-8"), mtime=0)
+
+
+def decompress_html(content: str | bytes) -> str | bytes:
+    """
+    Return the HTML of a stored source, which may or may not be compressed.
+    """
+    if isinstance(content, bytes) and content.startswith(GZIP_MAGIC):
+        return gzip.decompress(content)
+    return content
@@ -1,32 +1,54 @@
+import hashlib
+import json
+import logging
 import re
+import time
 import zoneinfo
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
 from datetime import datetime as dt
-from functools import cache
+from functools import cached_property
 from pathlib import Path
 
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import F, Min
+
 from lxml import html as etree
 from lxml.html import Element
 from slugify import slugify
 
 from froide.helper.db_utils import save_obj_with_slug
-from froide.publicbody.models import PublicBody
 
+from ..listeners import untracked
+from ..metrics import QueryCounter, StageTimer, report_metrics
 from ..models import (
     PressConference,
     Section,
-    Speaker,
     Speech,
     SpeechKind,
+    TranscriptBuilder,
+)
+from .cvd_artifact import (
+    ParsedPressConference,
+    dump_parsed,
+    get_artifact_name,
+    load_parsed,
 )
+from .cvd_fastparse import iter_parse, join_paragraphs
 from .cvd_grammar import (
+    GRAMMAR_VERSION,
     QuestionItem,
     SideNoteItem,
     SpeakerItem,
     SpeechItem,
-    bpk_grammar,
     function_speaker,
     ministry_speaker,
 )
+from .cvd_html import decompress_html
+from .cvd_text import clean_text, extract_text
+from .resolvers import SpeakerResolver, publicbody_index
 
 DATE_PATTERN = re.compile(r"\s*(\d{1,2})\.\s*(\d{1,2}|[a-zä]+)\.?\s*(\d{4})\s*")
 DE_MONTH_MAPPING = {
@@ -45,38 +67,84 @@ DE_MONTH_MAPPING = {
     "dezember": 12,
 }
 
-COLLAPSE_WS = re.compile(r" +")
-COLLAPSE_2NL = re.compile(r"\n\n\n+")
-
 BERLIN_TZ = zoneinfo.ZoneInfo("Europe/Berlin")
 
+BULK_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
 
-def clean_text(text):
-    text = text.replace("\xa0", " ")
-    return COLLAPSE_WS.sub(" ", text).strip()
+SectionTree = tuple[Section, list[Speech]]
 
 
-def extract_text(el):
-    result = []
+@dataclass
+class LoadReport:
+    sections: int = 0
+    speeches: int = 0
+    parsed_sections: int = 0
+    parsed_speeches: int = 0
+    queries: int = 0
+    duration: float = 0.0
+    skipped: bool = False
+    timings: dict[str, float] = field(default_factory=dict)
 
-    # Handle element's direct text
-    if el.text:
-        text = el.text
-        result.append(text)
+    def get_counters(self) -> dict[str, int]:
+        counters = asdict(self)
+        del counters["duration"], counters["timings"]
+        return {name: int(value) for name, value in counters.items()}
 
-    # Handle child els
-    for child in el:
-        child_text = extract_text(child)
-        result.append(child_text)
+    def emit(self):
+        report_metrics(self.timings, self.get_counters())
 
-        if child.tag in ("p", "br", "li"):
-            result.append("\n")
-        # Handle tail text
-        if child.tail:
-            tail = child.tail
-            result.append(tail)
 
-    return clean_text("".join(result))
+ITEM_KINDS = {
+    SideNoteItem: "sidenote",
+    QuestionItem: "question",
+    SpeakerItem: "speaker",
+    SpeechItem: "speech",
+}
+
+
+def get_content_hash(content: str | bytes) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_section_hash(speeches: list[Speech]) -> str:
+    return get_content_hash(
+        json.dumps(
+            [
+                [
+                    speech.kind,
+                    # `speaker_id` of speakers created by `create_missing` is
+                    # only set when the speech is saved
+                    speech.speaker.pk if speech.speaker else None,
+                    speech.label,
+                    speech.text,
+                ]
+                for speech in speeches
+            ]
+        )
+    )
+
+
+def needs_update(stored_hash: str, stored_grammar_version: int, source_hash: str):
+    """
+    Check whether a source has to be loaded again, because it changed or
+    was loaded with another version of the grammar.
+    """
+    return stored_hash != source_hash or stored_grammar_version != GRAMMAR_VERSION
+
+
+def delete_speeches(queryset) -> int:
+    """
+    Delete speeches with one query, without the delete signals.
+
+    With signal receivers Django loads every deleted row. Speeches have no
+    dependent rows, and the writer builds the text columns itself, so
+    sections deleted afterwards only load their own rows.
+    """
+    return queryset._raw_delete(queryset.db)
 
 
 def parse_date(date_str: str) -> dt:
@@ -95,26 +163,74 @@ def upper_first(s):
     return s[0].upper() + s[1:]
 
 
-@cache
 def get_publicbody_from_abbr(abbr: str):
-    try:
-        pb = (
-            PublicBody.objects.filter(
-                other_names__contains=abbr, jurisdiction__slug="bund"
-            )
-            .order_by("id")
-            .first()
-        )
-        return pb
-    except PublicBody.DoesNotExist:
-        return None
+    return publicbody_index.get(abbr)
+
+
+class ParseArtifactStore:
+    """
+    Keeps parse artifacts next to the source files in a storage.
+
+    An artifact lets later loads of the same source skip HTML parsing, text
+    extraction and the grammar. Artifacts of another grammar version or of
+    an older source are ignored and replaced on the next parse.
+    """
+
+    def __init__(self, storage=None):
+        if storage is None:
+            storage = PressConference._meta.get_field("source_file").storage
+        self.storage = storage
+
+    def load(self, source_name: str, source_hash: str) -> ParsedPressConference | None:
+        name = get_artifact_name(source_name)
+        if not self.storage.exists(name):
+            return None
+        try:
+            with self.storage.open(name) as f:
+                return load_parsed(f.read(), source_hash)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring broken parse artifact %s: %s", name, e)
+            return None
+
+    def save(self, source_name: str, parsed: ParsedPressConference):
+        name = get_artifact_name(source_name)
+        # Storages pick another name if the file exists
+        if self.storage.exists(name):
+            self.storage.delete(name)
+        self.storage.save(name, ContentFile(dump_parsed(parsed)))
+
+
+def get_artifact_store() -> ParseArtifactStore | None:
+    if getattr(settings, "PRESSCONFERENCE_PARSE_ARTIFACTS", False):
+        return ParseArtifactStore()
+    return None
 
 
 class CVDLoader:
     first_paragraph_has_topic = False
-
-    def __init__(self, content: str):
-        self.doc = etree.fromstring(content)
+    report: LoadReport | None = None
+
+    def __init__(
+        self,
+        content: str | bytes,
+        speakers: SpeakerResolver | None = None,
+        artifacts: ParseArtifactStore | None = None,
+        timer: StageTimer | None = None,
+    ):
+        # Stored sources may be compressed
+        content = decompress_html(content)
+        self.content = content
+        self.source_hash = get_content_hash(content)
+        self.artifacts = artifacts
+        if timer is None:
+            timer = StageTimer()
+        self.timer = timer
+        self.writer = PressConferenceWriter(speakers, timer=timer)
+
+    @cached_property
+    def doc(self):
+        with self.timer.stage("html_load"):
+            return etree.fromstring(self.content)
 
     def get_text(self, xpath):
         if (el := self.get_el(xpath)) is not None:
@@ -182,16 +298,7 @@ class CVDLoader:
                 yield text, meta
                 meta = None
 
-    def get_as_text(self):
-        content = "\n\n".join(
-            content for content, meta in self.extract_paragraphs()
-        ).strip()
-        return COLLAPSE_2NL.sub("\n\n", content).strip() + "\n\n"
-
-    def parse_with_grammar(self, text):
-        return bpk_grammar.parse_string(text, parse_all=True)
-
-    def create_and_load(self, category_slug):
+    def create_and_load(self, category_slug, bulk: bool = False, force: bool = False):
         date = self.get_date()
         try:
             pc, _created = PressConference.objects.get_or_create(
@@ -200,29 +307,193 @@ class CVDLoader:
             )
         except PressConference.DoesNotExist:
             pass
-        self.parse_and_load(pc)
-
-    def parse_and_load(self, pc: PressConference):
+        self.parse_and_load(pc, bulk=bulk, force=force)
+
+    def iter_items(self) -> Iterator[tuple[str, str]]:
+        """
+        Parse paragraph by paragraph and yield items as (kind, text) pairs.
+
+        `get_topics` needs to run before, as it decides whether the first
+        paragraph is part of the transcript.
+        """
+        paragraphs = (content for content, meta in self.extract_paragraphs())
+        paragraphs = self.timer.iter("text", paragraphs)
+        for item in self.timer.iter("grammar", iter_parse(paragraphs)):
+            if type(item) in ITEM_KINDS:
+                yield ITEM_KINDS[type(item)], str(item)
+
+    def parse(self) -> ParsedPressConference:
         date = self.get_date()
-        topics = self.get_topics()
-        description = "\n".join(topics)
-        title = f"Regierungspressekonferenz vom {date.strftime('%d.%m.%Y')}"
+        with self.timer.stage("topics"):
+            topics = self.get_topics()
+        items = list(self.iter_items())
+        return ParsedPressConference(
+            source_hash=self.source_hash, date=date, topics=topics, items=items
+        )
+
+    def parse_cached(self, source_name: str) -> ParsedPressConference:
+        """
+        Read the parse artifact of `source_name` or parse and write one.
+
+        Without an artifact store this is the same as `parse`.
+        """
+        if self.artifacts is None:
+            return self.parse()
+        with self.timer.stage("artifact"):
+            parsed = self.artifacts.load(source_name, self.source_hash)
+        if parsed is None:
+            parsed = self.parse()
+            with self.timer.stage("artifact"):
+                self.artifacts.save(source_name, parsed)
+        return parsed
+
+    def parse_and_load(
+        self, pc: PressConference, bulk: bool = False, force: bool = False
+    ):
+        """
+        Parse the document and store it on `pc`.
+
+        Unless `force` is given, nothing is done if the source has the same
+        hash and the grammar the same version as on the last load. Otherwise
+        only sections whose content hash changed are rewritten, or with
+        `bulk` all sections are replaced.
+        """
+        if not force and not self.writer.needs_update(pc, self.source_hash):
+            self.report = self.writer.skip(pc)
+            self.report.timings = self.timer.get_timings()
+            self.report.emit()
+            return pc
+        start = time.perf_counter()
+        # Parse before the write transaction starts, so it is not held open
+        # while parsing
+        parsed = self.parse_cached(pc.source_file.name)
+        self.writer.load(pc, parsed, bulk=bulk)
+        self.report = self.writer.report
+        self.report.duration = time.perf_counter() - start
+        self.report.emit()
+        return pc
+
 
-        pc.date = date
+class PressConferenceWriter:
+    """
+    Stores parse results as sections and speeches of a press conference.
+    """
+
+    def __init__(
+        self, speakers: SpeakerResolver | None = None, timer: StageTimer | None = None
+    ):
+        if speakers is None:
+            speakers = SpeakerResolver()
+        self.speakers = speakers
+        if timer is None:
+            timer = StageTimer()
+        self.timer = timer
+        self.report: LoadReport | None = None
+
+    def needs_update(self, pc: PressConference, source_hash: str) -> bool:
+        return needs_update(pc.source_hash, pc.grammar_version, source_hash)
+
+    def skip(self, pc: PressConference) -> LoadReport:
+        self.report = LoadReport(skipped=True)
+        logger.info("Skipped %s: source unchanged", pc)
+        return self.report
+
+    def load(
+        self, pc: PressConference, parsed: ParsedPressConference, bulk: bool = False
+    ):
+        start = time.perf_counter()
+        description = "\n".join(parsed.topics)
+        title = f"Regierungspressekonferenz vom {parsed.date.strftime('%d.%m.%Y')}"
+
+        pc.date = parsed.date
         pc.title = title
         pc.slug = slugify(title)
         pc.description = description
-        save_obj_with_slug(pc)
-        updating = pc.sections.all().count() > 0
-        if updating:
-            pc.sections.all().delete()
 
-        text = self.get_as_text()
-        parse_result = self.parse_with_grammar(text)
-        parse_types = (SideNoteItem, QuestionItem, SpeakerItem, SpeechItem)
-        section = None
-        question_label = None
+        report = LoadReport()
+        queries = QueryCounter()
+        # Press conference fields, sections and transcript columns are
+        # committed together or not at all
+        with (
+            connection.execute_wrapper(queries),
+            self.timer.stage("db_write"),
+            untracked(),
+            transaction.atomic(),
+        ):
+            save_obj_with_slug(pc)
+            transcript = TranscriptBuilder()
+            sections = self.iter_sections(pc, parsed.items, report, transcript)
+            try:
+                if bulk:
+                    report.sections, report.speeches = self.write_sections_bulk(
+                        pc, sections
+                    )
+                else:
+                    report.sections, report.speeches = self.write_sections(pc, sections)
+            except Exception:
+                # Speakers created in the rolled back transaction are gone
+                self.speakers.reset()
+                raise
+
+            # Only store the hash once the sections are written
+            pc.source_hash = parsed.source_hash
+            pc.grammar_version = GRAMMAR_VERSION
+            transcript.apply(pc)
+            pc.save(
+                update_fields=[
+                    "source_hash",
+                    "grammar_version",
+                    "content",
+                    "speaker_names",
+                ]
+            )
+
+        report.queries = queries.count
+        report.duration = time.perf_counter() - start
+        report.timings = self.timer.get_timings()
+        self.report = report
+        logger.info(
+            "Loaded %s: wrote %s sections, %s speeches in %.2fs",
+            pc,
+            self.report.sections,
+            self.report.speeches,
+            self.report.duration,
+        )
+        return pc
+
+    def iter_sections(
+        self,
+        pc: PressConference,
+        items: Iterable[tuple[str, str]],
+        report: LoadReport,
+        transcript: TranscriptBuilder,
+    ) -> Iterator[SectionTree]:
+        sections = self.timer.iter("sections", self.build_sections(pc, items))
+        for section, speeches in sections:
+            # Section hashes refer to speaker ids
+            with self.timer.stage("speakers"):
+                self.speakers.create_missing()
+            section.content_hash = get_section_hash(speeches)
+            # Unchanged sections are not written but still part of the text
+            transcript.add_section(speeches)
+            report.parsed_sections += 1
+            report.parsed_speeches += len(speeches)
+            yield section, speeches
+
+    def build_sections(
+        self, pc: PressConference, items: Iterable[tuple[str, str]]
+    ) -> Iterator[SectionTree]:
+        """
+        Turn the item stream into unsaved sections with their speeches.
+
+        Sections are yielded once they are complete. That is when a speech
+        starts in a later section, because until then paragraphs can still
+        be added to the last speech.
+        """
+        # Sections that are not yielded yet
+        sections = []
         section_order = 0
+        question_label = None
         speech_order = 0
         last_speech = None
         speech_kind = None
@@ -247,22 +518,24 @@ class CVDLoader:
 
         def new_section():
             nonlocal section_order
-            section, _created = Section.objects.get_or_create(
-                press_conference=pc,
-                order=section_order,
-            )
+            section = Section(press_conference=pc, order=section_order)
             section_order += 1
-            return section
+            speeches = []
+            sections.append((section, speeches))
+            return speeches
 
         def parse_speaker(speaker_name):
+            with self.timer.stage("speakers"):
+                return resolve_speaker(speaker_name)
+
+        def resolve_speaker(speaker_name):
             if match := ministry_speaker.re_match(speaker_name):
                 title, name, ministry_abbr = match.groups()
                 title = title or ""
                 pb = get_publicbody_from_abbr(ministry_abbr)
-                speaker, _created = Speaker.objects.get_or_create(
+                return self.speakers.get_or_create(
                     title=title, name=name, publicbody=pb
                 )
-                return speaker
             if match := function_speaker.re_match(speaker_name):
                 function, name = match.groups()
                 pb = None
@@ -272,73 +545,147 @@ class CVDLoader:
                     and speaker_name in pc.category.host.other_names
                 ):
                     pb = pc.category.host
-                speaker, _created = Speaker.objects.get_or_create(
+                return self.speakers.get_or_create(
                     name=name.strip(), title=function.strip(), publicbody=pb
                 )
-                return speaker
-            speaker = Speaker.objects.filter(
-                name=speaker_name,
-            ).first()
-            if not speaker:
-                speaker, _created = Speaker.objects.get_or_create(
-                    name=speaker_name,
-                )
-            return speaker
-
-        section = new_section()
-        for item in parse_result.as_list():
-            if not isinstance(item, parse_types):
-                continue
-            if isinstance(item, SideNoteItem):
-                Speech.objects.update_or_create(
-                    section=section,
-                    order=speech_order,
-                    defaults={
-                        "kind": SpeechKind.SIDENOTE,
-                        "text": str(item).strip(),
-                    },
+            return self.speakers.get_by_name(speaker_name)
+
+        speeches = new_section()
+        for item_kind, item_text in items:
+            if item_kind == "sidenote":
+                speeches.append(
+                    Speech(
+                        kind=SpeechKind.SIDENOTE,
+                        order=speech_order,
+                        text=item_text.strip(),
+                    )
                 )
                 speech_order += 1
-            elif isinstance(item, QuestionItem):
-                question_label = str(item)
+            elif item_kind == "question":
+                question_label = item_text
                 continued = is_continued_question(question_label)
                 if continued:
                     speech_kind = SpeechKind.FOLLOWUP
                 else:
                     speech_kind = SpeechKind.QUESTION
-                    section = new_section()
+                    speeches = new_section()
                 speaker = None
-            elif isinstance(item, SpeakerItem):
-                speaker_name = str(item)
-                speaker = parse_speaker(speaker_name)
+            elif item_kind == "speaker":
+                speaker = parse_speaker(item_text)
                 speech_kind = SpeechKind.SPEECH
                 question_label = ""
-            elif isinstance(item, SpeechItem):
+            elif item_kind == "speech":
                 if is_same_speech(speech_kind, speaker):
-                    last_speech.text += f"\n\n{str(item)}"
+                    last_speech.text += f"\n\n{item_text}"
                     last_speech.text = last_speech.text.strip()
-                    last_speech.save()
                 else:
-                    last_speech, _created = Speech.objects.update_or_create(
-                        section=section,
+                    last_speech = Speech(
+                        kind=speech_kind or SpeechKind.SPEECH,
                         order=speech_order,
-                        defaults={
-                            "kind": speech_kind or SpeechKind.SPEECH,
-                            "speaker": speaker,
-                            "label": question_label or "",
-                            "text": str(item).strip(),
-                        },
+                        speaker=speaker,
+                        label=question_label or "",
+                        text=item_text.strip(),
                     )
+                    speeches.append(last_speech)
                     speech_order += 1
-
-        if updating:
-            Section.objects.filter(
-                press_conference=pc, order__gte=section_order
-            ).delete()
-            Speech.objects.filter(
-                section__press_conference=pc, order__gte=speech_order
-            ).delete()
-        return pc
+                    yield from sections[:-1]
+                    del sections[:-1]
+        yield from sections
+
+    def write_sections(
+        self, pc: PressConference, sections: Iterable[SectionTree]
+    ) -> tuple[int, int]:
+        """
+        Write only sections whose content hash differs from the stored one.
+
+        Changed sections keep their row (and with it flags, comments and
+        linked requests) and get their speeches replaced.
+        """
+        existing = {section.order: section for section in pc.sections.all()}
+        first_speech_orders = dict(
+            Speech.objects.filter(section__press_conference=pc)
+            .values("section_id")
+            .annotate(first_order=Min("order"))
+            .values_list("section_id", "first_order")
+        )
+        section_count = 0
+        speech_count = 0
+        with transaction.atomic():
+            for batch in batch_sections(sections):
+                new_sections = []
+                changed_sections = []
+                new_speeches = []
+                for section, speeches in batch:
+                    old_section = existing.pop(section.order, None)
+                    if old_section is not None:
+                        if old_section.content_hash == section.content_hash:
+                            # Speech order counts across sections, so it moves
+                            # when an earlier section gained or lost speeches
+                            first_order = first_speech_orders.get(old_section.id)
+                            if speeches and first_order != speeches[0].order:
+                                Speech.objects.filter(section=old_section).update(
+                                    order=F("order") + speeches[0].order - first_order
+                                )
+                            continue
+                        old_section.content_hash = section.content_hash
+                        changed_sections.append(old_section)
+                        section = old_section
+                    else:
+                        new_sections.append(section)
+                    for speech in speeches:
+                        speech.section = section
+                        new_speeches.append(speech)
+
+                if changed_sections:
+                    delete_speeches(Speech.objects.filter(section__in=changed_sections))
+                    Section.objects.bulk_update(changed_sections, ["content_hash"])
+                Section.objects.bulk_create(new_sections)
+                Speech.objects.bulk_create(new_speeches, batch_size=BULK_BATCH_SIZE)
+                section_count += len(new_sections) + len(changed_sections)
+                speech_count += len(new_speeches)
+
+            if existing:
+                stale_ids = [section.id for section in existing.values()]
+                delete_speeches(Speech.objects.filter(section_id__in=stale_ids))
+                Section.objects.filter(id__in=stale_ids).delete()
+        return section_count, speech_count
+
+    def write_sections_bulk(
+        self, pc: PressConference, sections: Iterable[SectionTree]
+    ) -> tuple[int, int]:
+        section_count = 0
+        speech_count = 0
+        with transaction.atomic():
+            delete_speeches(Speech.objects.filter(section__press_conference=pc))
+            pc.sections.all().delete()
+            for batch in batch_sections(sections):
+                Section.objects.bulk_create([section for section, _speeches in batch])
+                speeches = []
+                for section, section_speeches in batch:
+                    for speech in section_speeches:
+                        speech.section = section
+                        speeches.append(speech)
+                Speech.objects.bulk_create(speeches, batch_size=BULK_BATCH_SIZE)
+                section_count += len(batch)
+                speech_count += len(speeches)
+        return section_count, speech_count
+
+
+def batch_sections(sections: Iterable[SectionTree]) -> Iterator[list[SectionTree]]:
+    """
+    Group sections so that each batch holds about BULK_BATCH_SIZE speeches.
+    """
+    batch = []
+    speech_count = 0
+    for section, speeches in sections:
+        batch.append((section, speeches))
+        speech_count += len(speeches)
+        if speech_count >= BULK_BATCH_SIZE:
+            yield batch
+            batch = []
+            speech_count = 0
+    if batch:
+        yield batch
 
 
 if __name__ == "__main__":
@@ -353,7 +700,9 @@ if __name__ == "__main__":
             with open(filename) as f:
                 content = f.read()
             loader = CVDLoader(content)
-            text = loader.get_as_text()
+            text = join_paragraphs(
+                content for content, meta in loader.extract_paragraphs()
+            )
             try:
                 result = loader.parse()
             except Exception:
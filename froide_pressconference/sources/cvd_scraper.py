@@ -1,11 +1,20 @@
 import asyncio
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import date
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import aiohttp
 from lxml import html as etree
 from pydoll.browser import Chrome
+from pydoll.browser.chromium.base import Browser
 from pydoll.browser.options import ChromiumOptions
 from pydoll.browser.tab import Tab
+from pydoll.protocol.fetch.events import FetchEvent
+from pydoll.protocol.network.types import ErrorReason, ResourceType
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +23,137 @@ DOMAIN = "https://cvd.bundesregierung.de"
 
 BERLIN = ZoneInfo("Europe/Berlin")
 
+COOKIE_FILE_NAME = "cvd_cookies.json"
+# Cookie fields that can be set again, see CookieParam
+COOKIE_PARAM_KEYS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+)
+
+
+class LoggedOutError(Exception):
+    pass
+
+
+class HttpTab:
+    """
+    Loads pages over HTTP with the session cookies of the browser.
+
+    Offers the part of the Tab interface that listings and items need, so it
+    can take the place of a browser tab. Pages that cannot be loaded over
+    HTTP, e.g. because the session expired, are loaded in the `fallback`
+    browser tab one at a time.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        fallback: Tab | None = None,
+        fallback_lock: asyncio.Lock | None = None,
+        content: str = "",
+    ):
+        self.session = session
+        self.fallback = fallback
+        self.fallback_lock = fallback_lock or asyncio.Lock()
+        self.content = content
+
+    async def go_to(self, url: str):
+        try:
+            self.content = await self.fetch(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, LoggedOutError) as e:
+            if self.fallback is None:
+                raise
+            logger.info("Loading %s in browser: %r", url, e)
+            async with self.fallback_lock:
+                await self.fallback.go_to(url)
+                self.content = await self.fallback.page_source
+
+    async def fetch(self, url: str) -> str:
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            if response.url.path.endswith("/login"):
+                raise LoggedOutError(f"Redirected to {response.url}")
+            return await response.text()
+
+    @property
+    async def page_source(self) -> str:
+        return self.content
+
+
+def make_http_session(cookies: list[dict], concurrency: int = 1):
+    """
+    Create an HTTP session with the cookies exported from the browser and a
+    connection pool of `concurrency` connections.
+    """
+    return aiohttp.ClientSession(
+        cookies={cookie["name"]: cookie["value"] for cookie in cookies},
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        timeout=aiohttp.ClientTimeout(total=60),
+    )
+
 
 async def get_dom(tab: Tab):
     content = await tab.page_source
     return etree.fromstring(content)
 
 
-async def login(tab: Tab, username, password):
+async def block_resources(browser: Browser):
+    """
+    Let all tabs of the browser load documents only.
+    """
+
+    async def on_request_paused(event):
+        params = event["params"]
+        if params.get("resourceType") == ResourceType.DOCUMENT:
+            await browser.continue_request(params["requestId"])
+        else:
+            await browser.fail_request(
+                params["requestId"], ErrorReason.BLOCKED_BY_CLIENT
+            )
+
+    await browser.enable_fetch_events()
+    await browser.on(FetchEvent.REQUEST_PAUSED, on_request_paused)
+
+
+async def restore_cookies(browser: Browser, profile_dir: str):
+    path = Path(profile_dir) / COOKIE_FILE_NAME
+    if not path.exists():
+        return
+    cookies = []
+    for cookie in json.loads(path.read_text()):
+        param = {key: cookie[key] for key in COOKIE_PARAM_KEYS if key in cookie}
+        # Session cookies have no expiry
+        if cookie.get("expires", -1) > 0:
+            param["expires"] = cookie["expires"]
+        cookies.append(param)
+    await browser.set_cookies(cookies)
+
+
+async def save_cookies(tab: Tab, profile_dir: str):
+    path = Path(profile_dir) / COOKIE_FILE_NAME
+    path.write_text(json.dumps(await tab.get_cookies()))
+
+
+async def login(tab: Tab, username, password, reuse_session=False):
+    """
+    Log into the CVD. With `reuse_session`, a session that is still valid
+    is kept.
+    """
     await tab.go_to(f"{DOMAIN}/cvd-de/login")
-    input_username = await tab.find(tag_name="input", name="userName", timeout=20)
+    input_username = await tab.find(
+        tag_name="input",
+        name="userName",
+        timeout=10 if reuse_session else 20,
+        raise_exc=not reuse_session,
+    )
+    if input_username is None:
+        logger.info("Reusing logged in session")
+        return
     await input_username.insert_text(username)
     input_password = await tab.find(tag_name="input", name="password")
     await input_password.insert_text(password)
@@ -32,7 +163,13 @@ async def login(tab: Tab, username, password):
     await tab.find(text="Willkommen", tag_name="h1", timeout=20)
 
 
-async def start_search(tab: Tab):
+async def start_search(tab: Tab, date_from: date | None = None):
+    """
+    Search for government press conferences, optionally only those from
+    `date_from` on.
+
+    Returns the path of the result pages and the number of result pages.
+    """
     await tab.go_to(f"{DOMAIN}/cvd-de/pressekonferenzen-briefings")
     form = await tab.find(tag_name="form", name="SuchFormular", timeout=20)
     search_action = form.attributes.get("action") or ""
@@ -42,15 +179,19 @@ async def start_search(tab: Tab):
     search_url = (
         search_action if search_action.startswith("http") else (DOMAIN + search_action)
     )
+    from_str = date_from.strftime("%d.%m.%Y") if date_from else ""
     query = (
         f"?formState={form_state}&query=Regierungspressekonferenz&facets%5B71432%5D=71424"
-        "&dateRanges%5B71432%5D.from=&dateRanges%5B71432%5D.to=&submit=suchen"
+        f"&dateRanges%5B71432%5D.from={from_str}&dateRanges%5B71432%5D.to=&submit=suchen"
     )
     await tab.go_to(search_url + query)
     dom = await get_dom(tab)
 
     # paging: pick second-to-last <li> inside .paging
     lis = dom.xpath("//div[contains(@class, 'paging')]//ul//li")
+    if len(lis) < 2:
+        # A single result page has no paging, it is already loaded
+        return "", 1
     target_li = lis[-2]
     last_a = target_li.xpath(".//a")[0]
     last_href = last_a.attrib["href"]
@@ -67,7 +208,8 @@ async def download_listing(tab, result_path, page_num=1):
 
     root = await get_dom(tab)
 
-    rows = root.xpath("//table/tbody/tr")
+    # Browsers add tbody to tables, HTML over HTTP may not have it
+    rows = root.xpath("//table//tr[td]")
     results = []
     for row in rows:
         date_cell, link_cell = row.xpath("./td")
@@ -87,34 +229,219 @@ async def download_listing(tab, result_path, page_num=1):
 
 
 class DummyHandler:
-    def should_download(self, url: str) -> bool:
+    async def should_download(self, url: str) -> bool:
         return True
 
-    def store_html(self, url: str, file_path: str, content: str): ...
-
-
-async def download_pages(tab: Tab, handler: DummyHandler):
-    rss_path, max_page = await start_search(tab)
-    logger.debug("Found %s pages", max_page)
-
-    for pnum in range(1, max_page + 1):
+    async def is_known(self, url: str) -> bool:
+        return False
+
+    async def store_html(self, url: str, file_path: str, content: str): ...
+
+    async def listing_done(self, page: int, last_url: str): ...
+
+
+async def iter_listings(
+    tab,
+    handler: DummyHandler,
+    result_path: str,
+    max_page: int,
+    stop_after_known_pages: int | None = None,
+    start_page: int = 1,
+    walked_until_page: int = 0,
+) -> AsyncIterator[dict]:
+    """
+    Yield the press conference items to download in listing page order.
+
+    Results are listed newest first. With `stop_after_known_pages`, the
+    crawl ends after that many pages in a row without a new item. Known
+    items that are downloaded again, like recent ones checked for revisions,
+    do not count as new. Pages up to `walked_until_page` were walked by an
+    interrupted crawl that is resumed, they do not count as pages without a
+    new item.
+
+    The handler is told when all items of a page have been handed out.
+    """
+    known_pages = 0
+    for pnum in range(start_page, max_page + 1):
         logger.debug("Trying page %s", pnum)
-        items = await download_listing(tab, rss_path, page_num=pnum)
+        items = await download_listing(tab, result_path, page_num=pnum)
+        new_items = 0
         for item in items:
             if not item["title"].startswith("Regierungspressekonferenz"):
                 continue
             logger.debug(item["title"])
-            item_url = item["url"]
-            if not (await handler.should_download(item_url)):
+            if not (await handler.should_download(item["url"])):
                 continue
-            await tab.go_to(item_url)
-            html = await tab.page_source
-            name = item_url.rstrip("/").rsplit("/", 1)[-1] or "index"
-            file_path = f"cvd/{name}.html"
-            await handler.store_html(item_url, file_path, html)
-
+            if not (await handler.is_known(item["url"])):
+                new_items += 1
+            yield item
+        await handler.listing_done(pnum, items[-1]["url"] if items else "")
+        if pnum <= walked_until_page:
+            continue
+        known_pages = 0 if new_items else known_pages + 1
+        if stop_after_known_pages and known_pages >= stop_after_known_pages:
+            logger.info("Stopping at page %s, %s pages without news", pnum, known_pages)
+            return
+
+
+async def download_item(tab: Tab, handler: DummyHandler, item_url: str):
+    start = time.perf_counter()
+    await tab.go_to(item_url)
+    html = await tab.page_source
+    logger.info("Loaded %s in %.2fs", item_url, time.perf_counter() - start)
+    name = item_url.rstrip("/").rsplit("/", 1)[-1] or "index"
+    file_path = f"cvd/{name}.html"
+    await handler.store_html(item_url, file_path, html)
+
+
+async def download_items(
+    tabs: list[Tab], handler: DummyHandler, items: AsyncIterator[dict]
+):
+    """
+    Download items with one download per tab at a time.
+
+    The next item is only read when a tab is free, so listing pages are
+    loaded in order and no faster than their items are downloaded. If a
+    download fails, the others are cancelled and the error is raised.
+    """
+    free_tabs = asyncio.Queue()
+    for tab in tabs:
+        free_tabs.put_nowait(tab)
+    semaphore = asyncio.Semaphore(len(tabs))
+
+    async def download(item_url):
+        tab = await free_tabs.get()
+        try:
+            await download_item(tab, handler, item_url)
+        finally:
+            free_tabs.put_nowait(tab)
+            semaphore.release()
+
+    async with asyncio.TaskGroup() as group:
+        while True:
+            # Wait for a free slot before reading on, the listing tab may be
+            # the only item tab
+            await semaphore.acquire()
+            item = await anext(items, None)
+            if item is None:
+                semaphore.release()
+                break
+            group.create_task(download(item["url"]))
+
+
+async def download_pages_http(
+    tab: Tab,
+    handler: DummyHandler,
+    rss_path: str,
+    max_page: int,
+    concurrency: int,
+    stop_after_known_pages: int | None,
+    start_page: int,
+    walked_until_page: int,
+):
+    cookies = await tab.get_cookies()
+    async with make_http_session(cookies, concurrency) as session:
+        fallback_lock = asyncio.Lock()
+        # The first listing page is already loaded in the browser
+        listing_tab = HttpTab(
+            session, tab, fallback_lock, content=await tab.page_source
+        )
+        item_tabs = [
+            HttpTab(session, tab, fallback_lock) for _ in range(max(concurrency, 1))
+        ]
+        items = iter_listings(
+            listing_tab,
+            handler,
+            rss_path,
+            max_page,
+            stop_after_known_pages,
+            start_page,
+            walked_until_page,
+        )
+        await download_items(item_tabs, handler, items)
+
+
+async def download_pages(
+    tab: Tab,
+    handler: DummyHandler,
+    browser: Browser | None = None,
+    concurrency: int = 1,
+    http: bool = False,
+    stop_after_known_pages: int | None = None,
+    date_from: date | None = None,
+    start_page: int = 1,
+    walked_until_page: int = 0,
+):
+    """
+    Download the press conferences of the search results that the handler
+    does not know yet.
+
+    Listing pages are loaded in `tab`. With a `browser` and a `concurrency`
+    above one, that many additional tabs download the items in parallel.
+    With `http`, only the search runs in the browser, listings and items are
+    loaded over HTTP with the browser session and `tab` as fallback.
+    `stop_after_known_pages` and `date_from` limit the crawl to recent
+    results, see `iter_listings` and `start_search`. `start_page` and
+    `walked_until_page` resume an interrupted crawl.
+    """
+    rss_path, max_page = await start_search(tab, date_from=date_from)
+    logger.debug("Found %s pages", max_page)
 
-async def download_cvd(username, password, handler, chrome_binary_path=None):
+    if http:
+        await download_pages_http(
+            tab,
+            handler,
+            rss_path,
+            max_page,
+            concurrency,
+            stop_after_known_pages,
+            start_page,
+            walked_until_page,
+        )
+        return
+
+    items = iter_listings(
+        tab,
+        handler,
+        rss_path,
+        max_page,
+        stop_after_known_pages,
+        start_page,
+        walked_until_page,
+    )
+    if browser is None or concurrency <= 1:
+        await download_items([tab], handler, items)
+        return
+
+    item_tabs = [await browser.new_tab() for _ in range(concurrency)]
+    try:
+        await download_items(item_tabs, handler, items)
+    finally:
+        for item_tab in item_tabs:
+            await item_tab.close()
+
+
+async def download_cvd(
+    username,
+    password,
+    handler,
+    chrome_binary_path=None,
+    concurrency=1,
+    http=False,
+    stop_after_known_pages=None,
+    date_from=None,
+    start_page=1,
+    walked_until_page=0,
+    block=True,
+    profile_dir=None,
+):
+    """
+    Log in and download new press conferences, see `download_pages`.
+
+    With `block`, the browser loads documents only, no images, styles or
+    scripts. With a `profile_dir`, the browser profile and the session
+    cookies are kept there and login is skipped while the session is valid.
+    """
     options = ChromiumOptions()
     if chrome_binary_path:
         options.binary_location = chrome_binary_path
@@ -122,11 +449,29 @@ async def download_cvd(username, password, handler, chrome_binary_path=None):
     options.headless = True
     options.block_notifications = True
     options.block_popups = True
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={profile_dir}")
 
     async with Chrome(options=options) as browser:
         tab = await browser.start()
-        await login(tab, username, password)
-        await download_pages(tab, handler)
+        if block:
+            await block_resources(browser)
+        if profile_dir:
+            await restore_cookies(browser, profile_dir)
+        await login(tab, username, password, reuse_session=bool(profile_dir))
+        if profile_dir:
+            await save_cookies(tab, profile_dir)
+        await download_pages(
+            tab,
+            handler,
+            browser=browser,
+            concurrency=concurrency,
+            http=http,
+            stop_after_known_pages=stop_after_known_pages,
+            date_from=date_from,
+            start_page=start_page,
+            walked_until_page=walked_until_page,
+        )
 
 
 if __name__ == "__main__":
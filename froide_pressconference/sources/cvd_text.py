@@ -0,0 +1,64 @@
+import re
+
+COLLAPSE_WS = re.compile(r" +")
+
+LINE_BREAK_TAGS = ("p", "br", "li")
+
+
+def clean_text(text):
+    text = text.replace("\xa0", " ")
+    return COLLAPSE_WS.sub(" ", text).strip()
+
+
+def append_text(pieces: list[str], text: str, at_start: bool) -> bool:
+    # Leading whitespace of an element is dropped until its first text
+    if at_start:
+        text = text.lstrip()
+        if not text:
+            return True
+    pieces.append(text)
+    return False
+
+
+def extract_text(el):
+    """
+    Extract the text of an element with line breaks after p, br and li.
+
+    The text of every element is stripped at both ends, then whitespace is
+    normalized once for the whole result. This walks the tree once without
+    recursion, so deeply nested markup costs linear time.
+    """
+    pieces = []
+    at_start = True
+    if el.text:
+        at_start = append_text(pieces, el.text, at_start)
+    # Open elements with their remaining children, the index of their first
+    # piece and whether their parent was still at its start
+    stack = [(el, iter(el), 0, True)]
+    while stack:
+        element, children, start, parent_at_start = stack[-1]
+        child = next(children, None)
+        if child is not None:
+            stack.append((child, iter(child), len(pieces), at_start))
+            at_start = True
+            if child.text:
+                at_start = append_text(pieces, child.text, at_start)
+            continue
+
+        stack.pop()
+        while len(pieces) > start:
+            stripped = pieces[-1].rstrip()
+            if stripped:
+                pieces[-1] = stripped
+                break
+            pieces.pop()
+        if not stack:
+            break
+        if len(pieces) == start:
+            at_start = parent_at_start
+        if element.tag in LINE_BREAK_TAGS:
+            at_start = append_text(pieces, "\n", at_start)
+        if element.tail:
+            at_start = append_text(pieces, element.tail, at_start)
+
+    return clean_text("".join(pieces))
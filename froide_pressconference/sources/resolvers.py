@@ -0,0 +1,126 @@
+import time
+
+from django.conf import settings
+
+from froide.publicbody.models import PublicBody
+
+from ..models import Speaker
+
+SpeakerKey = tuple[str, str, int | None]
+
+PUBLICBODY_INDEX_TTL = 60 * 60
+
+
+class PublicBodyAbbreviationIndex:
+    """
+    Maps ministry abbreviations to public bodies of one jurisdiction.
+
+    The public bodies are loaded with a single query and matched in memory
+    with the same semantics as an `other_names__contains` lookup ordered by
+    id. The index is dropped when a public body changes (see listeners) and
+    reloaded after `PRESSCONFERENCE_PUBLICBODY_INDEX_TTL` seconds, so long
+    running workers pick up changes made in other processes.
+    """
+
+    def __init__(self, jurisdiction_slug: str = "bund"):
+        self.jurisdiction_slug = jurisdiction_slug
+        self.invalidate()
+
+    def invalidate(self):
+        self.publicbodies: list[PublicBody] | None = None
+        self.matches: dict[str, PublicBody | None] = {}
+        self.loaded_at = 0.0
+
+    def get_ttl(self) -> float:
+        return getattr(
+            settings, "PRESSCONFERENCE_PUBLICBODY_INDEX_TTL", PUBLICBODY_INDEX_TTL
+        )
+
+    def is_stale(self) -> bool:
+        if self.publicbodies is None:
+            return True
+        return time.monotonic() - self.loaded_at > self.get_ttl()
+
+    def load(self):
+        self.publicbodies = list(
+            PublicBody.objects.filter(jurisdiction__slug=self.jurisdiction_slug)
+            .only("id", "name", "other_names")
+            .order_by("id")
+        )
+        self.matches = {}
+        self.loaded_at = time.monotonic()
+
+    def get(self, abbr: str) -> PublicBody | None:
+        if self.is_stale():
+            self.load()
+        try:
+            return self.matches[abbr]
+        except KeyError:
+            pass
+        pb = next((pb for pb in self.publicbodies if abbr in pb.other_names), None)
+        self.matches[abbr] = pb
+        return pb
+
+
+publicbody_index = PublicBodyAbbreviationIndex()
+
+
+class SpeakerResolver:
+    """
+    Resolves speakers in memory instead of querying once per speaker item.
+
+    Known speakers are loaded with a single query on first use. Speakers that
+    do not exist yet are kept as unsaved instances until `create_missing`
+    writes them with one `bulk_create`. A resolver can be shared by all
+    loaders of a batch run.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.loaded = False
+        self.by_key: dict[SpeakerKey, Speaker] = {}
+        self.by_name: dict[str, Speaker] = {}
+        self.pending: list[Speaker] = []
+
+    def load(self):
+        speakers = Speaker.objects.only("id", "name", "title", "publicbody").order_by(
+            "id"
+        )
+        for speaker in speakers:
+            self.add(speaker)
+        self.loaded = True
+
+    def add(self, speaker: Speaker):
+        key = (speaker.title, speaker.name, speaker.publicbody_id)
+        self.by_key.setdefault(key, speaker)
+        self.by_name.setdefault(speaker.name, speaker)
+
+    def get_or_create(
+        self, name: str, title: str = "", publicbody: PublicBody | None = None
+    ) -> Speaker:
+        if not self.loaded:
+            self.load()
+        key = (title, name, publicbody.id if publicbody else None)
+        speaker = self.by_key.get(key)
+        if speaker is None:
+            speaker = Speaker(name=name, title=title, publicbody=publicbody)
+            self.pending.append(speaker)
+            self.add(speaker)
+        return speaker
+
+    def get_by_name(self, name: str) -> Speaker:
+        if not self.loaded:
+            self.load()
+        speaker = self.by_name.get(name)
+        if speaker is None:
+            speaker = self.get_or_create(name)
+        return speaker
+
+    def create_missing(self) -> int:
+        count = len(self.pending)
+        if self.pending:
+            Speaker.objects.bulk_create(self.pending)
+            self.pending = []
+        return count
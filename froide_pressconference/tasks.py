@@ -1,63 +1,296 @@
 import asyncio
 import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
 
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db.models import Max
+from django.utils import timezone
 
+from asgiref.sync import sync_to_async
 from celery import shared_task
 
-from .models import PressConference, PressConferenceCategory
+from .models import (
+    CrawlState,
+    PendingReindex,
+    PressConference,
+    PressConferenceCategory,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class CvdHandler:
-    def __init__(self, pc_category):
+    def __init__(self, pc_category, crawl_state=None):
         self.pc_category = pc_category
+        self.crawl_state = crawl_state
+        # URLs that have a stored source file, loaded once per crawl
+        self.known_urls: set[str] | None = None
+        # Known URLs of recent press conferences to check for revisions
+        self.revision_urls: set[str] = set()
+        # Ids of stored press conferences to parse, see `parsing`
+        self.parse_queue: asyncio.Queue[int] | None = None
+        self.speakers = None
 
-    async def should_download(self, url: str) -> bool:
+    @asynccontextmanager
+    async def parsing(self, queue_size: int):
+        """
+        Parse stored press conferences while the crawl goes on.
+
+        Storing waits while `queue_size` press conferences are waiting to be
+        parsed, so downloads never get far ahead of parsing. Stored press
+        conferences have no source hash until they are parsed, those still
+        queued when the crawl fails are parsed by a later run.
+        """
+        from .sources.resolvers import SpeakerResolver
+
+        self.parse_queue = asyncio.Queue(maxsize=queue_size)
+        self.speakers = SpeakerResolver()
+        worker = asyncio.create_task(self.parse_worker())
         try:
-            pc = await PressConference.objects.aget(
-                source_url=url,
+            yield
+            await self.parse_queue.join()
+        finally:
+            worker.cancel()
+            self.parse_queue = None
+
+    async def parse_worker(self):
+        while True:
+            pc_id = await self.parse_queue.get()
+            try:
+                await sync_to_async(parse_pressconferences)([pc_id], self.speakers)
+            except Exception:
+                logger.exception("Could not parse press conference %s", pc_id)
+            finally:
+                self.parse_queue.task_done()
+
+    async def load_known_urls(self):
+        pcs = PressConference.objects.exclude(source_url="").exclude(source_file="")
+        self.known_urls = {
+            url async for url in pcs.values_list("source_url", flat=True)
+        }
+        revision_days = getattr(settings, "CVD_REVISION_DAYS", 7)
+        if revision_days:
+            recent = pcs.filter(
+                date__gte=timezone.now() - timedelta(days=revision_days)
             )
-        except PressConference.DoesNotExist:
-            return True
-        return not pc.source_file
+            self.revision_urls = {
+                url async for url in recent.values_list("source_url", flat=True)
+            }
+
+    async def should_download(self, url: str) -> bool:
+        if self.known_urls is None:
+            await self.load_known_urls()
+        return url not in self.known_urls or url in self.revision_urls
+
+    async def is_known(self, url: str) -> bool:
+        if self.known_urls is None:
+            await self.load_known_urls()
+        return url in self.known_urls
+
+    def is_revised(self, pc: PressConference, content: str) -> bool:
+        from .sources.cvd_html import decompress_html, get_transcript_hash
+
+        with pc.source_file.open() as f:
+            stored = decompress_html(f.read())
+        return get_transcript_hash(stored) != get_transcript_hash(content)
+
+    def save_source(
+        self, pc: PressConference, file_path: str, content: str, revision: bool
+    ) -> bool:
+        """
+        Store the trimmed and compressed transcript of `pc`.
+
+        A transcript fetched again to check for a `revision` is only stored
+        if its text changed. Returns whether it was stored.
+        """
+        from .sources.cvd_html import COMPRESSED_SUFFIX, compress_html, trim_html
+
+        content = trim_html(content)
+        if revision:
+            if pc.source_file and not self.is_revised(pc, content):
+                return False
+            logger.info("Transcript of %s was revised", pc.source_url)
+            pc.source_file.delete(save=False)
+            # Marks the press conference as not parsed, so a later run parses
+            # it if this one fails before
+            pc.source_hash = ""
+        pc.source_file.save(
+            file_path + COMPRESSED_SUFFIX,
+            ContentFile(compress_html(content)),
+            save=False,
+        )
+        pc.save()
+        return True
 
     async def store_html(self, url: str, file_path: str, content: str):
         pc, _created = await PressConference.objects.aget_or_create(
             source_url=url, category=self.pc_category
         )
-        pc.source_file.save(file_path, ContentFile(content), save=False)
-        await pc.asave()
+        # Only recent press conferences are fetched again
+        revision = url in self.revision_urls
+        self.revision_urls.discard(url)
+        # Trimming, hashing and storage writes block
+        stored = await sync_to_async(self.save_source)(pc, file_path, content, revision)
+        if not stored:
+            return
+        if self.known_urls is not None:
+            self.known_urls.add(url)
+        if self.parse_queue is not None:
+            await self.parse_queue.put(pc.id)
 
+    async def listing_done(self, page: int, last_url: str):
+        if self.crawl_state is not None:
+            await self.crawl_state.asave_progress(page, last_url)
 
-@shared_task
-def update_cvd_task():
+
+def get_search_date_from(pc_category):
+    """
+    Search from the date of the latest parsed press conference on, minus
+    `CVD_SEARCH_OVERLAP_DAYS` for late transcripts. Unset searches all.
+    """
+    overlap_days = getattr(settings, "CVD_SEARCH_OVERLAP_DAYS", None)
+    if overlap_days is None:
+        return None
+    latest = (
+        PressConference.objects.filter(category=pc_category)
+        .exclude(slug="")
+        .aggregate(latest=Max("date"))["latest"]
+    )
+    if latest is None:
+        return None
+    return latest.date() - timedelta(days=overlap_days)
+
+
+def get_unparsed_pressconferences(pc_category):
+    """
+    Stored press conferences of the last `CVD_PARSE_RETRY_DAYS` days that
+    have no source hash.
+
+    That covers new transcripts, which are dated by their download until
+    parsed, and revisions, which are only fetched again while recent. Older
+    sources without a hash were loaded before hashes were stored or keep
+    failing, they are left to `parse_pressconferences`.
+    """
+    retry_days = getattr(settings, "CVD_PARSE_RETRY_DAYS", 7)
+    return PressConference.objects.filter(
+        source_hash="",
+        category=pc_category,
+        date__gte=timezone.now() - timedelta(days=retry_days),
+    ).exclude(source_file="")
+
+
+async def crawl_cvd(handler: CvdHandler, **kwargs):
     from .sources.cvd_scraper import download_cvd
 
+    async with handler.parsing(getattr(settings, "CVD_PARSE_QUEUE_SIZE", 10)):
+        await download_cvd(handler=handler, **kwargs)
+
+
+@shared_task
+def update_cvd_task():
     pc_category = PressConferenceCategory.objects.get(slug="bpk")
-    handler = CvdHandler(pc_category)
-    username, password = settings.CVD_CREDENTIALS.split(",", 1)
-    asyncio.run(
-        download_cvd(
-            username, password, handler, chrome_binary_path=settings.CHROME_BINARY_PATH
-        )
+    crawl_state = CrawlState.acquire(
+        pc_category,
+        stop_after_known_pages=getattr(settings, "CVD_STOP_AFTER_KNOWN_PAGES", 2),
+        date_from=get_search_date_from(pc_category),
     )
-    pcs = PressConference.objects.filter(slug="", category=pc_category)
-    for pc in pcs:
-        parse_pressconference_task.delay(pc.id)
+    if crawl_state is None:
+        logger.info("Crawl of %s is already running", pc_category)
+        return
+
+    try:
+        # New transcripts are parsed during the crawl, queue recent ones
+        # that earlier runs stored but did not parse
+        queue_parse_pressconferences(get_unparsed_pressconferences(pc_category))
+        start_page = crawl_state.get_resume_page()
+        if start_page > 1:
+            logger.info(
+                "Resuming crawl of %s at page %s (run %s)",
+                pc_category,
+                start_page,
+                crawl_state.run_id,
+            )
+        handler = CvdHandler(pc_category, crawl_state)
+        username, password = settings.CVD_CREDENTIALS.split(",", 1)
+        asyncio.run(
+            crawl_cvd(
+                handler,
+                username=username,
+                password=password,
+                chrome_binary_path=settings.CHROME_BINARY_PATH,
+                concurrency=getattr(settings, "CVD_DOWNLOAD_CONCURRENCY", 1),
+                http=getattr(settings, "CVD_DOWNLOAD_HTTP", True),
+                # Page numbers refer to the search of the run resumed
+                stop_after_known_pages=crawl_state.stop_after_known_pages,
+                date_from=crawl_state.date_from,
+                start_page=start_page,
+                walked_until_page=crawl_state.last_page,
+                block=getattr(settings, "CVD_BLOCK_RESOURCES", True),
+                profile_dir=getattr(settings, "CVD_BROWSER_PROFILE_DIR", None),
+            )
+        )
+        crawl_state.finish()
+    finally:
+        crawl_state.release()
 
 
-def parse_pressconference(pc):
-    from .sources.cvd_loader import CVDLoader
+def parse_pressconference(pc, speakers=None):
+    from .metrics import StageTimer
+    from .sources.cvd_loader import CVDLoader, get_artifact_store
 
-    with pc.source_file.open() as f:
+    timer = StageTimer()
+    with timer.stage("html_load"), pc.source_file.open() as f:
         content = f.read()
-    loader = CVDLoader(content)
+    loader = CVDLoader(
+        content, speakers=speakers, artifacts=get_artifact_store(), timer=timer
+    )
     loader.parse_and_load(pc)
 
 
+def parse_pressconferences(pc_ids, speakers=None):
+    """
+    Parse press conferences with one speaker resolver, so speakers are
+    loaded once for all of them. Failures are logged and skipped.
+    """
+    from .sources.resolvers import SpeakerResolver
+
+    if speakers is None:
+        speakers = SpeakerResolver()
+    pcs = (
+        PressConference.objects.filter(id__in=pc_ids)
+        .select_related("category__host")
+        .defer("content", "speaker_names")
+    )
+    for pc in pcs:
+        try:
+            parse_pressconference(pc, speakers=speakers)
+        except Exception:
+            logger.exception("Could not parse press conference %s", pc.id)
+
+
+def queue_in_chunks(task, pc_ids: list[int], chunk_size: int) -> int:
+    """
+    Queue `task` once per chunk of `chunk_size` press conference ids.
+    """
+    for start in range(0, len(pc_ids), chunk_size):
+        task.delay(pc_ids[start : start + chunk_size])
+    return len(pc_ids)
+
+
+def queue_parse_pressconferences(queryset):
+    """
+    Queue parse tasks for a queryset in chunks of
+    `PRESSCONFERENCE_PARSE_CHUNK_SIZE` press conferences.
+    """
+    return queue_in_chunks(
+        parse_pressconferences_task,
+        list(queryset.order_by("id").values_list("id", flat=True)),
+        getattr(settings, "PRESSCONFERENCE_PARSE_CHUNK_SIZE", 50),
+    )
+
+
 @shared_task
 def parse_pressconference_task(pc_id):
     try:
@@ -66,3 +299,81 @@ def parse_pressconference_task(pc_id):
         return
 
     parse_pressconference(pc)
+
+
+@shared_task
+def parse_pressconferences_task(pc_ids):
+    parse_pressconferences(pc_ids)
+
+
+def update_transcripts(pc_ids):
+    """
+    Rebuild the text columns of press conferences after their speeches or
+    speakers changed, and mark them for reindexing.
+    """
+    pcs = PressConference.objects.filter(id__in=pc_ids).defer(
+        "content", "speaker_names"
+    )
+    for pc in pcs:
+        pc.update_transcript()
+    PendingReindex.add(pc_ids)
+
+
+def queue_update_transcripts(pc_ids):
+    """
+    Queue `update_transcripts` in chunks of
+    `PRESSCONFERENCE_TRANSCRIPT_CHUNK_SIZE` press conferences.
+    """
+    return queue_in_chunks(
+        update_transcripts_task,
+        sorted(set(pc_ids)),
+        getattr(settings, "PRESSCONFERENCE_TRANSCRIPT_CHUNK_SIZE", 100),
+    )
+
+
+@shared_task
+def update_transcripts_task(pc_ids):
+    update_transcripts(pc_ids)
+
+
+def reindex_pending(batch_size=100):
+    """
+    Update the search documents of press conferences marked as pending.
+
+    Rows are only removed once their documents are updated, and only if
+    they were not marked again after the press conferences were read. A
+    failed update leaves them for the next run.
+    """
+    from .documents import PressConferenceDocument
+
+    doc = PressConferenceDocument()
+    count = 0
+    last_id = 0
+    while True:
+        started = timezone.now()
+        pending = list(
+            PendingReindex.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "pressconference_id")[:batch_size]
+        )
+        if not pending:
+            return count
+        last_id = pending[-1][0]
+        pc_ids = [pc_id for _row_id, pc_id in pending]
+        # Deleted press conferences are already removed from the index
+        pcs = list(doc.get_queryset().filter(id__in=pc_ids))
+        if pcs:
+            doc.update(pcs)
+        PendingReindex.objects.filter(
+            id__in=[row_id for row_id, _pc_id in pending], marked_at__lte=started
+        ).delete()
+        count += len(pcs)
+
+
+@shared_task
+def reindex_pending_task():
+    count = reindex_pending(
+        batch_size=getattr(settings, "PRESSCONFERENCE_REINDEX_BATCH_SIZE", 100)
+    )
+    if count:
+        logger.info("Reindexed %s edited press conferences", count)
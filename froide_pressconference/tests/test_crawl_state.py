@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from ..models import CrawlLockLost, CrawlState, PressConferenceCategory
+
+
+@pytest.fixture
+def category():
+    return PressConferenceCategory.objects.create(name="BPK", slug="bpk")
+
+
+def save_progress(state, page):
+    # Runs in this thread, so the test transaction is visible
+    async_to_sync(state.asave_progress)(page, f"https://example.org/{page}")
+
+
+@pytest.mark.django_db
+def test_held_lease_blocks_acquire(category):
+    assert CrawlState.acquire(category) is not None
+    assert CrawlState.acquire(category) is None
+
+
+@pytest.mark.django_db
+def test_expired_lease_is_taken_over(category):
+    crashed = CrawlState.acquire(category)
+    CrawlState.objects.filter(id=crashed.id).update(
+        locked_until=timezone.now() - timedelta(seconds=1)
+    )
+
+    state = CrawlState.acquire(category)
+    assert state is not None
+    assert state.run_id != crashed.run_id
+
+
+@pytest.mark.django_db
+def test_resume_after_crash_and_reset_after_finish(category):
+    state = CrawlState.acquire(
+        category, stop_after_known_pages=2, date_from=date(2026, 10, 1)
+    )
+    save_progress(state, 5)
+    state.release()
+
+    resumed = CrawlState.acquire(category, stop_after_known_pages=None)
+    assert resumed.get_resume_page() == 4
+    assert resumed.stop_after_known_pages == 2
+    assert resumed.date_from == date(2026, 10, 1)
+    resumed.finish()
+    resumed.release()
+
+    fresh = CrawlState.acquire(category, stop_after_known_pages=None)
+    assert fresh.get_resume_page() == 1
+    assert fresh.last_url == ""
+    assert fresh.stop_after_known_pages is None
+    assert fresh.date_from is None
+
+
+@pytest.mark.django_db
+def test_progress_fails_once_another_run_holds_the_lease(category):
+    state = CrawlState.acquire(category)
+    save_progress(state, 1)
+    CrawlState.objects.filter(id=state.id).update(locked_until=None)
+    assert CrawlState.acquire(category) is not None
+
+    with pytest.raises(CrawlLockLost):
+        save_progress(state, 2)
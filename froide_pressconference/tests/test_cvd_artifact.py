@@ -0,0 +1,46 @@
+import zoneinfo
+from datetime import datetime as dt
+
+from ..sources import cvd_artifact
+from ..sources.cvd_artifact import (
+    ParsedPressConference,
+    dump_parsed,
+    get_artifact_name,
+    load_parsed,
+)
+
+PARSED = ParsedPressConference(
+    source_hash="abc",
+    date=dt(2024, 3, 1, tzinfo=zoneinfo.ZoneInfo("Europe/Berlin")),
+    topics=["Reise des Bundeskanzlers", "Haushalt"],
+    items=[
+        ("speaker", "SRS Büchner"),
+        ("speech", "Guten Tag, meine Damen und Herren!"),
+        ("question", "Frage"),
+        ("speech", "Wie geht es weiter?"),
+    ],
+)
+
+
+def test_artifact_roundtrip():
+    assert load_parsed(dump_parsed(PARSED), "abc") == PARSED
+
+
+def test_artifact_is_deterministic():
+    assert dump_parsed(PARSED) == dump_parsed(PARSED)
+
+
+def test_artifact_version_mismatch(monkeypatch):
+    content = dump_parsed(PARSED)
+    assert load_parsed(content, "other") is None
+    monkeypatch.setattr(
+        cvd_artifact, "GRAMMAR_VERSION", cvd_artifact.GRAMMAR_VERSION + 1
+    )
+    assert load_parsed(content, "abc") is None
+
+
+def test_artifact_name():
+    assert (
+        get_artifact_name("pressconferences/2024-03-01.html")
+        == "pressconferences/2024-03-01.parsed.json.gz"
+    )
@@ -0,0 +1,53 @@
+from lxml import html as etree
+
+from ..sources.cvd_html import (
+    compress_html,
+    decompress_html,
+    get_transcript_hash,
+    trim_html,
+)
+from ..sources.cvd_text import extract_text
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>CVD</title><script>var tracking = 1;</script>
+<link rel="stylesheet" href="/main.css"></head>
+<body><nav><ul>{navigation}</ul></nav>
+<main><h1>Regierungspressekonferenz vom 1. März 2024</h1>
+<p class="date">1. März 2024</p>
+<div class="basepage_pages">
+<div class="abstract"><p>Themen: Haushalt, Reise</p></div>
+<p>Sprecher: SRS Büchner</p>
+<p>SRS Büchner: Guten Tag, Frau Müller – schön, Sie zu sehen!</p>
+</div></main>
+<footer>{navigation}</footer></body></html>
+""".format(
+    navigation="".join(f"<li><a href='/{i}'>Link {i}</a></li>" for i in range(200))
+)
+
+
+def get_parts(content):
+    doc = etree.fromstring(content)
+    return [
+        extract_text(doc.xpath(xpath)[0])
+        for xpath in ("//p[@class='date']", "//div[@class='basepage_pages']")
+    ]
+
+
+def test_trimmed_html_keeps_transcript():
+    trimmed = trim_html(PAGE)
+    assert get_parts(decompress_html(compress_html(trimmed))) == get_parts(PAGE)
+    assert len(compress_html(trimmed)) * 10 < len(PAGE.encode("utf-8"))
+
+
+def test_untrimmed_sources_are_read_as_is():
+    assert decompress_html(PAGE.encode("utf-8")) == PAGE.encode("utf-8")
+    assert trim_html("<html><body><p>Fehler</p></body></html>") == (
+        "<html><body><p>Fehler</p></body></html>"
+    )
+
+
+def test_transcript_hash_ignores_page_chrome():
+    trimmed = trim_html(PAGE)
+    assert get_transcript_hash(trimmed) == get_transcript_hash(PAGE)
+    revised = PAGE.replace("Guten Tag", "Guten Morgen")
+    assert get_transcript_hash(revised) != get_transcript_hash(PAGE)
@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+import pytest
+
+from ..management.commands import parse_pressconferences
+from ..models import PendingReindex, PressConference, Section, Speaker, Speech
+from ..sources.cvd_loader import CVDLoader, PressConferenceWriter
+from ..sources.resolvers import SpeakerResolver
+
+TRANSCRIPT = """<html><body>
+<p class="date">17. Oktober 2026</p>
+<div class="basepage_pages">
+<div class="abstract"><p>Themen: Haushalt, Verkehr</p></div>
+<p>SRS Hille</p>
+<p>Einen schönen, guten Tag!</p>
+<p>Frage</p>
+<p>Wie geht es weiter?</p>
+<p>Wagner (BMF)</p>
+<p>Das prüfen wir.</p>
+</div>
+</body></html>"""
+
+
+def load(pc, force=False, bulk=False):
+    loader = CVDLoader(TRANSCRIPT, speakers=SpeakerResolver())
+    loader.parse_and_load(pc, force=force, bulk=bulk)
+    return loader.report
+
+
+@pytest.mark.django_db
+def test_reload_with_new_speakers_rewrites_no_section():
+    pc = PressConference.objects.create()
+    report = load(pc)
+    assert report.sections > 0
+    assert Speaker.objects.filter(name__in=["Hille", "Wagner"]).count() == 2
+    hashes = dict(Section.objects.values_list("order", "content_hash"))
+
+    report = load(pc, force=True)
+    assert report.sections == 0
+    assert report.speeches == 0
+    assert dict(Section.objects.values_list("order", "content_hash")) == hashes
+
+
+@pytest.mark.django_db
+def test_speech_delete_rebuilds_content(django_capture_on_commit_callbacks):
+    pc = PressConference.objects.create()
+    with django_capture_on_commit_callbacks(execute=True):
+        load(pc)
+    assert not PendingReindex.objects.exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Speech.objects.get(text="Das prüfen wir.").delete()
+    pc.refresh_from_db()
+    assert "Das prüfen wir." not in pc.content
+    assert "Wagner" not in pc.speaker_names
+    assert PendingReindex.objects.filter(pressconference_id=pc.id).exists()
+
+
+@pytest.mark.django_db
+def test_pressconference_queryset_delete_marks_nothing(
+    django_capture_on_commit_callbacks,
+):
+    pc = PressConference.objects.create()
+    with django_capture_on_commit_callbacks(execute=True):
+        load(pc)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PressConference.objects.filter(id=pc.id).delete()
+    assert not Speech.objects.exists()
+    assert not PendingReindex.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_write_keeps_press_conference(monkeypatch):
+    pc = PressConference.objects.create(title="Alt", slug="alt")
+
+    def fail(self, pc, sections):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(PressConferenceWriter, "write_sections", fail)
+    with pytest.raises(RuntimeError):
+        load(pc)
+    pc.refresh_from_db()
+    assert (pc.title, pc.slug, pc.source_hash) == ("Alt", "alt", "")
+
+
+def get_speeches(pc):
+    return list(
+        Speech.objects.filter(section__press_conference=pc)
+        .order_by("section__order", "order")
+        .values_list("section__order", "order", "kind", "speaker__name", "text")
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_reload_replaces_all_sections():
+    pc = PressConference.objects.create()
+    load(pc)
+    section_ids = set(Section.objects.values_list("id", flat=True))
+    speeches = get_speeches(pc)
+
+    report = load(pc, force=True, bulk=True)
+    assert report.sections == len(section_ids)
+    assert report.speeches == len(speeches)
+    assert section_ids.isdisjoint(Section.objects.values_list("id", flat=True))
+    assert get_speeches(pc) == speeches
+
+
+@pytest.mark.django_db
+def test_parse_command_bulk_flag(monkeypatch, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    # Workers in threads see the test database, and it stays open
+    monkeypatch.setattr(
+        parse_pressconferences, "ProcessPoolExecutor", ThreadPoolExecutor
+    )
+    monkeypatch.setattr(parse_pressconferences.connections, "close_all", lambda: None)
+    pc = PressConference.objects.create()
+    pc.source_file.save("rpk.html", ContentFile(TRANSCRIPT.encode()))
+    load(pc)
+    section_ids = set(Section.objects.values_list("id", flat=True))
+    speeches = get_speeches(pc)
+
+    call_command(
+        "parse_pressconferences",
+        "--bulk",
+        "--force",
+        "--workers=1",
+        stdout=StringIO(),
+        stderr=StringIO(),
+    )
+    assert section_ids.isdisjoint(Section.objects.values_list("id", flat=True))
+    assert get_speeches(pc) == speeches
@@ -0,0 +1,230 @@
+import asyncio
+
+from aiohttp import web
+
+from ..sources import cvd_scraper
+from ..sources.cvd_scraper import HttpTab
+
+PAGE_COUNT = 3
+ITEMS_PER_PAGE = 4
+
+
+class StandInServer:
+    """
+    Serves listing and transcript pages like the CVD and records requests.
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.listing_pages = []
+        self.active = 0
+        self.max_active = 0
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get("/search", self.listing)
+        app.router.add_get("/item/{num}", self.item)
+        app.router.add_get("/cvd-de/login", self.login)
+        return app
+
+    async def login(self, request):
+        return web.Response(text="<form></form>", content_type="text/html")
+
+    async def listing(self, request):
+        page = int(request.query.get("page", 1))
+        self.listing_pages.append(page)
+        rows = "".join(
+            f'<tr><td>{num}.01.2024</td><td><a href="/item/{num}">'
+            f"Regierungspressekonferenz {num}</a></td></tr>"
+            for num in range((page - 1) * ITEMS_PER_PAGE, page * ITEMS_PER_PAGE)
+        )
+        rows += '<tr><td>1.01.2024</td><td><a href="/other">Briefing</a></td></tr>'
+        return web.Response(
+            text=f"<html><body><table><tbody>{rows}</tbody></table></body></html>",
+            content_type="text/html",
+        )
+
+    async def item(self, request):
+        if request.cookies.get("session") != "valid":
+            raise web.HTTPFound("/cvd-de/login")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        num = request.match_info["num"]
+        return web.Response(
+            text=f"<html><body><p>Transcript {num}</p></body></html>",
+            content_type="text/html",
+        )
+
+
+class RecordingHandler:
+    def __init__(self, known=(), revisions=()):
+        self.known = set(known)
+        self.revisions = set(revisions)
+        self.stored = {}
+        self.done_pages = []
+
+    async def should_download(self, url):
+        num = url.rsplit("/", 1)[-1]
+        return num not in self.known or num in self.revisions
+
+    async def is_known(self, url):
+        return url.rsplit("/", 1)[-1] in self.known
+
+    async def store_html(self, url, file_path, content):
+        self.stored[file_path] = content
+
+    async def listing_done(self, page, last_url):
+        self.done_pages.append(page)
+
+
+def download(
+    monkeypatch,
+    server,
+    tab_count,
+    known=(),
+    revisions=(),
+    session_cookie="valid",
+    stop_after_known_pages=None,
+    start_page=1,
+    walked_until_page=0,
+):
+    handler = RecordingHandler(known, revisions)
+    cookies = [{"name": "session", "value": session_cookie}]
+
+    async def run():
+        runner = web.AppRunner(server.make_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        monkeypatch.setattr(cvd_scraper, "DOMAIN", f"http://127.0.0.1:{port}")
+        try:
+            async with (
+                cvd_scraper.make_http_session(cookies, tab_count) as session,
+                cvd_scraper.make_http_session(
+                    [{"name": "session", "value": "valid"}]
+                ) as browser_session,
+            ):
+                # Stands in for the logged in browser
+                browser_tab = HttpTab(browser_session)
+                listing_tab = HttpTab(session, fallback=browser_tab)
+                await listing_tab.go_to(f"{cvd_scraper.DOMAIN}/search?page=1")
+                if tab_count == 1:
+                    tabs = [listing_tab]
+                else:
+                    tabs = [
+                        HttpTab(session, fallback=browser_tab) for _ in range(tab_count)
+                    ]
+                items = cvd_scraper.iter_listings(
+                    listing_tab,
+                    handler,
+                    "/search?",
+                    PAGE_COUNT,
+                    stop_after_known_pages=stop_after_known_pages,
+                    start_page=start_page,
+                    walked_until_page=walked_until_page,
+                )
+                await cvd_scraper.download_items(tabs, handler, items)
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+    return handler
+
+
+def test_download_items_concurrently(monkeypatch):
+    server = StandInServer()
+    handler = download(monkeypatch, server, tab_count=3, known=["5"])
+
+    expected = {
+        f"cvd/{num}.html" for num in range(PAGE_COUNT * ITEMS_PER_PAGE) if num != 5
+    }
+    assert set(handler.stored) == expected
+    assert "Transcript 7" in handler.stored["cvd/7.html"]
+    assert server.listing_pages == list(range(1, PAGE_COUNT + 1))
+    assert handler.done_pages == list(range(1, PAGE_COUNT + 1))
+    assert server.max_active == 3
+
+
+def test_download_items_in_listing_tab(monkeypatch):
+    server = StandInServer(delay=0.01)
+    handler = download(monkeypatch, server, tab_count=1)
+
+    assert len(handler.stored) == PAGE_COUNT * ITEMS_PER_PAGE
+    assert server.listing_pages == list(range(1, PAGE_COUNT + 1))
+    assert server.max_active == 1
+
+
+def test_download_falls_back_when_logged_out(monkeypatch):
+    server = StandInServer(delay=0.01)
+    handler = download(monkeypatch, server, tab_count=2, session_cookie="expired")
+
+    assert len(handler.stored) == PAGE_COUNT * ITEMS_PER_PAGE
+    assert "Transcript 3" in handler.stored["cvd/3.html"]
+    # Fallback loads run one at a time
+    assert server.max_active == 1
+
+
+def test_download_stops_after_known_pages(monkeypatch):
+    server = StandInServer(delay=0.01)
+    known = [str(num) for num in range(ITEMS_PER_PAGE, PAGE_COUNT * ITEMS_PER_PAGE)]
+    handler = download(
+        monkeypatch, server, tab_count=2, known=known, stop_after_known_pages=1
+    )
+
+    assert len(handler.stored) == ITEMS_PER_PAGE
+    assert server.listing_pages == [1, 2]
+
+
+def test_resumed_download_walks_known_pages(monkeypatch):
+    server = StandInServer(delay=0.01)
+    known = [str(num) for num in range(PAGE_COUNT * ITEMS_PER_PAGE - 1)]
+    handler = download(
+        monkeypatch,
+        server,
+        tab_count=2,
+        known=known,
+        stop_after_known_pages=1,
+        start_page=2,
+        walked_until_page=2,
+    )
+
+    assert list(handler.stored) == [f"cvd/{PAGE_COUNT * ITEMS_PER_PAGE - 1}.html"]
+    assert server.listing_pages == [1, 2, 3]
+
+
+def test_resumed_download_stops_after_walked_pages(monkeypatch):
+    server = StandInServer(delay=0.01)
+    known = [str(num) for num in range(PAGE_COUNT * ITEMS_PER_PAGE)]
+    handler = download(
+        monkeypatch,
+        server,
+        tab_count=2,
+        known=known,
+        stop_after_known_pages=1,
+        start_page=1,
+        walked_until_page=1,
+    )
+
+    assert handler.stored == {}
+    assert server.listing_pages == [1, 2]
+
+
+def test_revision_checks_do_not_count_as_new(monkeypatch):
+    server = StandInServer(delay=0.01)
+    known = [str(num) for num in range(PAGE_COUNT * ITEMS_PER_PAGE)]
+    handler = download(
+        monkeypatch,
+        server,
+        tab_count=2,
+        known=known,
+        revisions=["0", "1"],
+        stop_after_known_pages=1,
+    )
+
+    assert set(handler.stored) == {"cvd/0.html", "cvd/1.html"}
+    assert server.listing_pages == [1]
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+from lxml import html as etree
+
+from ..sources.benchmark import extract_text_recursive, make_nested
+from ..sources.cvd_text import extract_text
+
+TEXTS = ["", " ", "  ", "\n", "\xa0", "a", " b ", "Wort  Wort", "\n x\n", "\t"]
+TAGS = ["p", "br", "li", "span", "div", "ul", "strong"]
+
+
+def make_tree(rnd, depth):
+    el = etree.Element(rnd.choice(TAGS))
+    el.text = rnd.choice(TEXTS) or None
+    if depth > 0:
+        for _ in range(rnd.randint(0, 3)):
+            child = make_tree(rnd, depth - 1)
+            child.tail = rnd.choice(TEXTS) or None
+            el.append(child)
+    return el
+
+
+HTML_CASES = [
+    "<div>Eins <b>zwei</b> drei</div>",
+    "<div><p>Absatz</p><p> Zweiter\xa0 Absatz </p></div>",
+    "<ul><li>Eins</li><li><span> </span></li><li>Drei<br>Vier</li></ul>",
+    "<div> <!-- Kommentar --> <span>\n</span> Text <br/> </div>",
+]
+
+
+@pytest.mark.parametrize("content", HTML_CASES)
+def test_extract_text_fixtures(content):
+    el = etree.fromstring(content)
+    assert extract_text(el) == extract_text_recursive(el)
+
+
+def test_extract_text_random_trees():
+    rnd = random.Random(42)
+    for _ in range(2000):
+        el = make_tree(rnd, rnd.randint(0, 4))
+        assert extract_text(el) == extract_text_recursive(el)
+
+
+def test_extract_text_deep_nesting():
+    el = make_nested(5000)
+    assert extract_text(el).startswith("Text 0 Text 1")
@@ -0,0 +1,42 @@
+import pytest
+
+from ..documents import PressConferenceDocument
+from ..models import PressConference, Section, Speaker, Speech
+
+
+@pytest.mark.django_db
+def test_prepare_queries_per_chunk(django_assert_num_queries):
+    speaker = Speaker.objects.create(name="Hille")
+    for day in range(1, 4):
+        pc = PressConference.objects.create(slug=f"rpk-{day}")
+        for order in range(2):
+            section = Section.objects.create(press_conference=pc, order=order)
+            Speech.objects.create(section=section, order=0, text="Frage")
+            Speech.objects.create(
+                section=section, order=1, speaker=speaker, text="Antwort"
+            )
+
+    doc = PressConferenceDocument()
+    # Press conferences, sections and speeches with their speakers
+    with django_assert_num_queries(3):
+        prepared = [doc.prepare(pc) for pc in doc.get_queryset()]
+    assert len(prepared) == 3
+    assert prepared[0]["speeches"][1] == {
+        "text": "Antwort",
+        "speaker": "Hille",
+        "kind": "",
+        "section": 0,
+        "order": 1,
+    }
+
+
+@pytest.mark.django_db
+def test_prepare_content_uses_current_description():
+    pc = PressConference.objects.create(slug="rpk", description="Haushalt")
+    section = Section.objects.create(press_conference=pc, order=0)
+    Speech.objects.create(section=section, order=0, text="Frage")
+    pc.update_transcript()
+
+    pc.description = "Verkehr"
+    pc.save()
+    assert PressConferenceDocument().prepare_content(pc) == "Verkehr\n\nFrage"
@@ -1,4 +1,21 @@
-from ..sources.cvd_grammar import SideNoteItem, SpeakerItem, SpeechItem, bpk_grammar
+from pathlib import Path
+
+import pytest
+from pyparsing import ParseException
+
+from ..sources.cvd_fastparse import (
+    ParagraphParseException,
+    iter_parse,
+    join_paragraphs,
+    parse_fast,
+)
+from ..sources.cvd_grammar import (
+    BodyItem,
+    SideNoteItem,
+    SpeakerItem,
+    SpeechItem,
+    bpk_grammar,
+)
 
 
 def test_speaker_detection():
@@ -47,3 +64,86 @@ Einen schönen, guten Tag auch von mir! Leider müssen wir auch heute wieder mit
     assert isinstance(stream[2], SideNoteItem)
     assert isinstance(stream[3], SpeakerItem)
     assert isinstance(stream[4], SpeechItem)
+
+
+def as_comparable(items):
+    return [
+        (type(item).__name__, str(item)) if isinstance(item, BodyItem) else item
+        for item in items
+    ]
+
+
+GRAMMAR_CASES = [
+    "Wagner (AA)\n\nBeispiel-Antwort sowieso interessant.\n\n",
+    "SRS Hille\n\nWir verfolgen das.\n\nWeiterer Absatz es geht hier weiter.\n\n",
+    """Sprecherinnen und Sprecher
+
+stellvertretender Regierungssprecher Hille
+• Müller (BMVg)
+• Dr. Laiadhi (BMF)
+
+(Vorsitzende Hamberger eröffnet die Pressekonferenz.)
+
+SRS Hille
+
+Einen schönen, guten Tag auch von mir!
+
+""",
+    "Frage\n\nWie geht es weiter?\n\nDr. Wagner (BMF): Das prüfen wir.\n\n",
+    "Zusatzfrage: Und dann?\n\nVorsitzende Hamberger: Bitte.\n\n",
+    "Zuruf Müller: Lauter!\n\n(Heiterkeit)\n\nStS’in Meier\n\nGut.\n\n",
+    "Text (mit\nKlammer) über Zeilen\n\n[Zwischenruf\nüber zwei Zeilen]\n\n",
+    "Zuruf\n\nMüller: Text\n\nFRAGE :  x\n\n",
+    "Text ohne Zeilenende",
+    "(Nur eine Randnotiz)\n\n",
+]
+
+
+@pytest.mark.parametrize("text", GRAMMAR_CASES)
+def test_fast_parse_equivalence(text):
+    try:
+        expected = as_comparable(
+            bpk_grammar.parse_string(text, parse_all=True).as_list()
+        )
+    except ParseException:
+        with pytest.raises(ParseException):
+            parse_fast(text)
+        return
+    assert as_comparable(parse_fast(text)) == expected
+
+
+@pytest.mark.parametrize("text", GRAMMAR_CASES)
+def test_streaming_parse_equivalence(text):
+    paragraphs = text.split("\n\n")
+    try:
+        expected = as_comparable(
+            bpk_grammar.parse_string(
+                join_paragraphs(paragraphs), parse_all=True
+            ).as_list()
+        )
+    except ParseException:
+        with pytest.raises(ParseException):
+            list(iter_parse(paragraphs))
+        return
+    assert as_comparable(iter_parse(iter(paragraphs))) == expected
+
+
+def test_streaming_parse_reports_paragraph():
+    # A transcript needs at least one element after the intro
+    paragraphs = ["Sprecher:", "• Müller (BMVg)", "(Heiterkeit)"]
+    with pytest.raises(ParagraphParseException) as excinfo:
+        list(iter_parse(paragraphs))
+    assert excinfo.value.paragraph_index == 2
+
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures").glob("regpk_*.txt"))
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda path: path.stem)
+def test_fixture_transcripts_parse_equivalence(path):
+    paragraphs = path.read_text().split("\n\n")
+    text = join_paragraphs(paragraphs)
+    expected = as_comparable(bpk_grammar.parse_string(text, parse_all=True).as_list())
+    assert len(expected) > 30
+    assert as_comparable(parse_fast(text)) == expected
+    assert as_comparable(iter_parse(iter(paragraphs))) == expected
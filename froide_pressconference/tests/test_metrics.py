@@ -0,0 +1,31 @@
+from ..metrics import StageTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_nested_stages_count_exclusive_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("time.perf_counter", clock)
+    timer = StageTimer()
+
+    def produce():
+        for i in range(3):
+            clock.advance(1)
+            with timer.stage("inner"):
+                clock.advance(10)
+            yield i
+
+    with timer.stage("outer"):
+        assert list(timer.iter("middle", produce())) == [0, 1, 2]
+        clock.advance(100)
+
+    assert timer.get_timings() == {"inner": 30, "middle": 3, "outer": 100}
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+
+from ..documents import PressConferenceDocument
+from ..models import PendingReindex, PressConference, PressConferenceCategory
+from ..tasks import get_unparsed_pressconferences, reindex_pending
+
+
+@pytest.mark.django_db
+def test_unparsed_pressconferences_are_recent():
+    category = PressConferenceCategory.objects.create(name="BPK", slug="bpk")
+    now = timezone.now()
+    stored = PressConference.objects.create(
+        category=category, source_file="cvd/neu.html.gz"
+    )
+    PressConference.objects.create(
+        category=category,
+        source_file="cvd/alt.html.gz",
+        date=now - timedelta(days=400),
+    )
+    PressConference.objects.create(
+        category=category, source_file="cvd/fertig.html.gz", source_hash="abc"
+    )
+    PressConference.objects.create(category=category)
+
+    assert list(get_unparsed_pressconferences(category)) == [stored]
+
+
+@pytest.mark.django_db
+def test_reindex_pending_keeps_marks_set_during_the_update(monkeypatch):
+    edited = PressConference.objects.create(slug="bearbeitet")
+    done = PressConference.objects.create(slug="fertig")
+    PendingReindex.add([edited.id, done.id])
+    row_id = PendingReindex.objects.get(pressconference_id=edited.id).id
+    updated = []
+
+    def update(self, pcs):
+        updated.extend(pc.id for pc in pcs)
+        # An edit while the documents are sent
+        PendingReindex.add([edited.id])
+
+    monkeypatch.setattr(PressConferenceDocument, "update", update)
+    assert reindex_pending() == 2
+    assert sorted(updated) == sorted([edited.id, done.id])
+    # The mark is refreshed in place and survives for the next run
+    assert list(PendingReindex.objects.values_list("id", "pressconference_id")) == [
+        (row_id, edited.id)
+    ]
+
+    monkeypatch.setattr(PressConferenceDocument, "update", lambda self, pcs: None)
+    assert reindex_pending() == 1
+    assert not PendingReindex.objects.exists()
@@ -1,6 +1,7 @@
 from collections import defaultdict
 from dataclasses import dataclass
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Count
@@ -8,6 +9,7 @@ from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 from django.views.decorators.http import require_POST
 from django.views.generic import DetailView
@@ -19,7 +21,7 @@ from froide.helper.search.views import BaseSearchView
 from froide.helper.utils import is_ajax
 
 from .documents import PressConferenceDocument
-from .filters import PressConferenceFilterSet
+from .filters import PressConferenceFilterSet, get_search_query
 from .forms import FlagForm
 from .models import Flag, FlagKind, PressConference, Section
 
@@ -79,6 +81,60 @@ def get_facet_data(
     }
 
 
+@dataclass
+class SpeechHit:
+    url: str
+    speaker: str
+    kind: str
+    highlight: str
+
+
+def attach_speech_hits(objects, query):
+    """
+    Attach the best matching speeches of each press conference as
+    `speech_hits` and return the press conferences as a list.
+
+    Runs the search query again for the given page of press conferences,
+    with the matching speeches as inner hits. Only these speeches are
+    highlighted, never the whole transcript.
+    """
+    objects = list(objects)
+    for obj in objects:
+        obj.speech_hits = []
+    if not objects or not query:
+        return objects
+    s = (
+        PressConferenceDocument.search()
+        .filter("ids", values=[str(obj.id) for obj in objects])
+        .query(
+            get_search_query(
+                query,
+                PressConferenceFilterSet.query_fields,
+                speech_hits=getattr(settings, "PRESSCONFERENCE_SPEECH_HITS", 3),
+            )
+        )
+        .source(False)
+        .extra(size=len(objects))
+    )
+    obj_map = {str(obj.id): obj for obj in objects}
+    for hit in s.execute():
+        obj = obj_map[hit.meta.id]
+        for speech in hit.meta.inner_hits.speeches:
+            # Same URL as Section.get_absolute_url without loading the section
+            section = Section(press_conference=obj, order=speech.section)
+            highlight = getattr(speech.meta, "highlight", None)
+            fragments = highlight["speeches.text"] if highlight else []
+            obj.speech_hits.append(
+                SpeechHit(
+                    url=section.get_absolute_url(),
+                    speaker=speech.speaker,
+                    kind=speech.kind,
+                    highlight=mark_safe(" … ".join(fragments)),
+                )
+            )
+    return objects
+
+
 class PressConferenceListView(BaseSearchView, BreadcrumbView):
     search_name = "pressconference"
     template_name = "froide_pressconference/pressconference_list.html"
@@ -109,6 +165,11 @@ class PressConferenceListView(BaseSearchView, BreadcrumbView):
             end_date=cleaned_data.get("date_before"),
         )
         context["facet_data_id"] = "facet-data"
+        if not self.api:
+            # API responses only hold the facet data
+            context["object_list"] = attach_speech_hits(
+                context["object_list"], cleaned_data.get("q")
+            )
         return context
 
     def render_to_response(self, context, **response_kwargs):